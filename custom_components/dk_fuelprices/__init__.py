@@ -2,26 +2,49 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-
 from types import MappingProxyType
 
 from homeassistant.config_entries import ConfigEntry, ConfigEntryState, ConfigSubentry
 from homeassistant.const import CONF_API_KEY
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import (
+    ConfigEntryAuthFailed,
+    ConfigEntryError,
+    ConfigEntryNotReady,
+)
 from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers import entity_registry as er
-from homeassistant.loader import async_get_integration
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.loader import async_get_loaded_integration
 
 from .api import APIClient, BraendstofpriserConfigEntry
 from .const import (
+    ATTR_CONFIG,
     ATTR_COORDINATOR,
+    ATTR_ENTITIES,
+    ATTR_HUB,
+    ATTR_SWEEP,
+    CONF_API_KEYS,
     CONF_COMPANY,
+    CONF_PRIORITY,
     CONF_PRODUCTS,
+    CONF_SETUP_CONCURRENCY,
     CONF_STATION,
+    CONF_SWEEP_BATCH,
+    CONF_SWEEP_RADIUS,
+    DATA_SNAPSHOT_STORES,
+    DEFAULT_PRIORITY,
+    DEFAULT_SETUP_CONCURRENCY,
+    DEFAULT_SWEEP_BATCH,
+    DEFAULT_SWEEP_RADIUS,
     DOMAIN,
+    SIGNAL_ADD_SUBENTRY,
     STARTUP,
 )
+from .hub import BraendstofpriserHub
+from .store import async_get_snapshot_store
+from .sweep import PriceSweep
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,42 +62,191 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
 
 
 async def _update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options or subentry updates by reloading the entry."""
-    hass.config_entries.async_schedule_reload(entry.entry_id)
+    """Handle entry updates, applying subentry changes without a reload."""
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if entry_data is None or entry_data[ATTR_CONFIG] != _entry_config(entry):
+        # The API key or options changed, which affects every station
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+        return
+
+    async with entry_data["lock"]:
+        running = entry_data["subentries"]
+        for subentry_id in running.keys() - entry.subentries.keys():
+            await _async_remove_subentry(hass, entry, subentry_id)
+
+        for subentry_id, subentry in entry.subentries.items():
+            if (current := running.get(subentry_id)) is not None:
+                if current[ATTR_CONFIG] == dict(subentry.data):
+                    continue
+                # Data of the same station stays valid, e.g. when only the
+                # products or the priority changed
+                await _async_remove_subentry(
+                    hass,
+                    entry,
+                    subentry_id,
+                    keep_data=all(
+                        current[ATTR_CONFIG].get(key) == subentry.data.get(key)
+                        for key in (CONF_COMPANY, CONF_STATION)
+                    ),
+                )
+
+            coordinator = _async_add_subentry(hass, entry, subentry)
+            async_dispatcher_send(
+                hass, SIGNAL_ADD_SUBENTRY.format(entry.entry_id), subentry_id
+            )
+            entry.async_create_background_task(
+                hass,
+                entry_data[ATTR_HUB].async_refresh_stations([coordinator]),
+                f"{DOMAIN} refresh station {coordinator.station_id}",
+            )
+
+
+def _entry_config(entry: ConfigEntry) -> tuple[dict, dict]:
+    """Return the entry settings shared by all stations."""
+    return dict(entry.data), dict(entry.options)
+
+
+@callback
+def _async_add_subentry(
+    hass: HomeAssistant, entry: ConfigEntry, subentry: ConfigSubentry
+) -> APIClient:
+    """Create the coordinator of a station subentry and register it."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    hub: BraendstofpriserHub = entry_data[ATTR_HUB]
+    coordinator = APIClient(
+        hass,
+        hub,
+        subentry.data.get(CONF_COMPANY),
+        subentry.data.get(CONF_STATION),
+        subentry.data.get(CONF_PRODUCTS, {}),
+        subentry.subentry_id,
+        subentry.data.get(CONF_PRIORITY, DEFAULT_PRIORITY),
+    )
+    if (snapshot := hub.store.get(subentry.subentry_id)) is not None:
+        coordinator.async_restore(snapshot, hub.store.get_history(subentry.subentry_id))
+    hub.async_add_coordinator(coordinator)
+    entry_data["subentries"][subentry.subentry_id] = {
+        ATTR_CONFIG: dict(subentry.data),
+        ATTR_COORDINATOR: coordinator,
+        ATTR_ENTITIES: [],
+    }
+    return coordinator
+
+
+async def _async_remove_subentry(
+    hass: HomeAssistant, entry: ConfigEntry, subentry_id: str, keep_data: bool = False
+) -> None:
+    """Stop the coordinator of a station subentry and remove its sensors."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    removed = entry_data["subentries"].pop(subentry_id)
+    for entity in removed[ATTR_ENTITIES]:
+        # Registry entries are kept, so a changed station keeps its entity IDs
+        await entity.async_remove()
+    entry_data[ATTR_HUB].async_remove_coordinator(subentry_id, keep_data)
+    await removed[ATTR_COORDINATOR].async_shutdown()
 
 
 async def _setup(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Setup the integration."""
-    integration = await async_get_integration(hass, DOMAIN)
-    _LOGGER.info(STARTUP, integration.version)
-
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][config_entry.entry_id] = {"subentries": {}}
+    if not hass.config_entries.async_loaded_entries(DOMAIN):
+        # Only log the banner for the first config entry set up
+        _LOGGER.info(STARTUP, async_get_loaded_integration(hass, DOMAIN).version)
 
     config_entry = await _ensure_initial_subentry(hass, config_entry)
     api_key = config_entry.data.get(CONF_API_KEY)
     if not api_key:
-        _LOGGER.error("Missing API key in config entry %s", config_entry.entry_id)
-        return False
-    for subentry_id, subentry in config_entry.subentries.items():
-        coordinator = APIClient(
-            hass,
-            api_key,
-            subentry.data.get(CONF_COMPANY),
-            subentry.data.get(CONF_STATION),
-            subentry.data.get(CONF_PRODUCTS, {}),
-            subentry_id,
+        # Fail before the platforms are set up without any entry data
+        raise ConfigEntryError(
+            f"Missing API key in config entry {config_entry.entry_id}"
         )
-        hass.data[DOMAIN][config_entry.entry_id]["subentries"][subentry_id] = {
-            ATTR_COORDINATOR: coordinator
-        }
 
+    store = await async_get_snapshot_store(hass, config_entry.entry_id)
+
+    # Extra keys from the options share the load of the primary key
+    api_keys = [api_key, *config_entry.options.get(CONF_API_KEYS, [])]
+    hub = BraendstofpriserHub(hass, config_entry, api_keys, store)
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN][config_entry.entry_id] = {
+        ATTR_CONFIG: _entry_config(config_entry),
+        ATTR_HUB: hub,
+        "lock": asyncio.Lock(),
+        "subentries": {},
+    }
+
+    for subentry in config_entry.subentries.values():
+        _async_add_subentry(hass, config_entry, subentry)
+
+    if config_entry.state == ConfigEntryState.SETUP_IN_PROGRESS:
+        # Stations restored from the snapshot store are refreshed in the background
+        restored = [c for c in hub.coordinators.values() if c.data is not None]
+        pending = [c for c in hub.coordinators.values() if c.data is None]
+        await _async_first_refresh(config_entry, pending)
+        for coordinator in pending:
+            hub.async_schedule_refresh(coordinator)
+        if restored:
+            config_entry.async_create_background_task(
+                hass,
+                hub.async_refresh_stations(restored),
+                f"{DOMAIN} refresh restored stations",
+            )
+
+    if radius := config_entry.options.get(CONF_SWEEP_RADIUS, DEFAULT_SWEEP_RADIUS):
+        sweep = PriceSweep(
+            hass,
+            hub,
+            radius,
+            config_entry.options.get(CONF_SWEEP_BATCH, DEFAULT_SWEEP_BATCH),
+        )
+        hass.data[DOMAIN][config_entry.entry_id][ATTR_SWEEP] = sweep
         if config_entry.state == ConfigEntryState.SETUP_IN_PROGRESS:
-            await coordinator.async_config_entry_first_refresh()
+            # The sweep covers many stations, so never hold up setup for it
+            config_entry.async_create_background_task(
+                hass, sweep.async_refresh(), f"{DOMAIN} initial sweep"
+            )
+
+    config_entry.async_on_unload(hub.async_close)
+    config_entry.async_on_unload(hub.async_start())
 
     return True
 
 
+async def _async_first_refresh(
+    config_entry: ConfigEntry, coordinators: list[APIClient]
+) -> None:
+    """Run the initial refresh of all stations concurrently."""
+    semaphore = asyncio.Semaphore(
+        config_entry.options.get(CONF_SETUP_CONCURRENCY, DEFAULT_SETUP_CONCURRENCY)
+    )
+
+    async def _async_refresh(coordinator: APIClient) -> None:
+        async with semaphore:
+            await coordinator.async_config_entry_first_refresh()
+
+    results = await asyncio.gather(
+        *(_async_refresh(coordinator) for coordinator in coordinators),
+        return_exceptions=True,
+    )
+
+    failed = 0
+    for coordinator, result in zip(coordinators, results):
+        if isinstance(result, ConfigEntryAuthFailed):
+            raise result
+        if isinstance(result, (ConfigEntryNotReady, ConfigEntryError)):
+            # A single failing station should not take down the whole entry
+            failed += 1
+            _LOGGER.warning(
+                "Initial refresh of station %s (%s) failed: %s",
+                coordinator.station_name,
+                coordinator.station_id,
+                result,
+            )
+        elif isinstance(result, BaseException):
+            raise result
+
+    if coordinators and failed == len(coordinators):
+        raise ConfigEntryNotReady("Initial refresh failed for all stations")
+
+
 async def _ensure_initial_subentry(
     hass: HomeAssistant, config_entry: ConfigEntry
 ) -> ConfigEntry:
@@ -119,10 +291,19 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
         config_entry, PLATFORMS
     )
     if unload_ok:
-        hass.data[DOMAIN].pop(config_entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(config_entry.entry_id)
+        # Histories and the budget are written rarely, write them as the entry stops
+        await entry_data[ATTR_HUB].async_flush()
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove stored data when a config entry is deleted."""
+    store = await async_get_snapshot_store(hass, config_entry.entry_id)
+    hass.data[DOMAIN][DATA_SNAPSHOT_STORES].pop(config_entry.entry_id)
+    await store.async_remove()
+
+
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Migrate old config entries to the new subentry structure."""
     if entry.version >= 2:
@@ -2,119 +2,354 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from datetime import datetime, timedelta
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
 
-from aiohttp import ClientResponseError
+from aiohttp import (
+    ClientConnectionError,
+    ClientError,
+    ClientResponseError,
+    ClientSession,
+    ClientTimeout,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_API_KEY
+from homeassistant.core import callback
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryError
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-from pybraendstofpriser import Braendstofpriser
-from pybraendstofpriser.exceptions import ProductNotFoundError
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_COMPANY, CONF_PRODUCTS, CONF_STATION, DOMAIN
+from .const import DEFAULT_PRIORITY, DOMAIN
+from .history import PriceHistory
 
-SCAN_INTERVAL = timedelta(hours=1)
+if TYPE_CHECKING:
+    from .hub import BraendstofpriserHub
+    from .metrics import ApiMetrics
 
 _LOGGER = logging.getLogger(__name__)
 
 type BraendstofpriserConfigEntry = ConfigEntry[APIClient]
 
 
-class APIClient(DataUpdateCoordinator[None]):
+@dataclass(slots=True)
+class CachedPrices:
+    """Last known get_prices response for a station."""
+
+    fingerprint: str
+    last_update: str | None
+    data: dict
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class PriceCache:
+    """Fetch station prices, skipping unchanged responses.
+
+    Conditional requests are sent when the backend returned an ETag or
+    Last-Modified header. Otherwise the response body is fingerprinted, and an
+    identical body is not parsed again. An unchanged response returns the
+    cached payload object itself, but whether the prices changed is up to each
+    caller, as the hub and the sweep fetch the same stations.
+    """
+
+    def __init__(self, session: ClientSession, base_url: str | None = None) -> None:
+        """Initialize the price cache."""
+        from pybraendstofpriser.conn import Endpoint
+        from pybraendstofpriser.const import API_ENDPOINT, API_TIMEOUT
+
+        self._session = session
+        self._timeout = ClientTimeout(total=API_TIMEOUT)
+        self._url = f"{base_url or API_ENDPOINT}{Endpoint.PRICES}"
+        self.closed = False
+        self._entries: dict[int, CachedPrices] = {}
+        self.hits = 0
+        self.misses = 0
+        # Set by the hub when metrics are enabled
+        self.metrics: ApiMetrics | None = None
+
+    @property
+    def hit_rate(self) -> float | None:
+        """Return the share of fetches that found unchanged prices."""
+        if not (total := self.hits + self.misses):
+            return None
+        return self.hits / total
+
+    def get(self, station_id: int) -> CachedPrices | None:
+        """Return the cached response for a station."""
+        return self._entries.get(station_id)
+
+    def invalidate(self, station_id: int | None = None) -> None:
+        """Forget one station, or every station."""
+        if station_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(station_id, None)
+
+    def close(self) -> None:
+        """Refuse further requests and drop the cached responses."""
+        self.closed = True
+        self._entries.clear()
+
+    async def async_get_prices(self, station_id: int, api_key: str) -> dict:
+        """Fetch prices for a station."""
+        if self.closed:
+            raise ClientConnectionError("Price cache is closed")
+
+        cached = self._entries.get(station_id)
+        headers = {"X-API-KEY": api_key}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        async with self._session.get(
+            self._url,
+            params={"station_id": station_id},
+            headers=headers,
+            timeout=self._timeout,
+        ) as response:
+            if response.status == 304 and cached is not None:
+                self.hits += 1
+                return cached.data
+
+            response.raise_for_status()
+            body = await response.read()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+
+        if self.metrics is not None:
+            self.metrics.record_payload(len(body))
+        fingerprint = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if cached is not None and cached.fingerprint == fingerprint:
+            self.hits += 1
+            cached.etag = etag
+            cached.last_modified = last_modified
+            return cached.data
+
+        data = json.loads(body)
+        last_update = data["station"].get("last_update")
+        if (
+            cached is not None
+            and last_update == cached.last_update
+            and data["prices"] == cached.data["prices"]
+        ):
+            # Same prices in a different body, keep handing out the known payload
+            self.hits += 1
+            data = cached.data
+        else:
+            self.misses += 1
+        self._entries[station_id] = CachedPrices(
+            fingerprint, last_update, data, etag, last_modified
+        )
+        return data
+
+
+@dataclass(frozen=True, slots=True)
+class StationData:
+    """Immutable prices of a station as of one refresh."""
+
+    station_name: str
+    updated_at: datetime | None
+    # Selected products, shared by every snapshot of a station
+    products: tuple[str, ...]
+    # Prices in the order of products
+    prices: tuple[float | None, ...]
+
+    def price(self, product: str) -> float | None:
+        """Return the price of a product."""
+        try:
+            return self.prices[self.products.index(product)]
+        except ValueError:
+            return None
+
+    def items(self) -> Iterator[tuple[str, float | None]]:
+        """Return (product, price) pairs."""
+        return zip(self.products, self.prices)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the data in the format of the snapshot store."""
+        return {
+            "station_name": self.station_name,
+            "updated_at": self.updated_at,
+            "prices": dict(self.items()),
+        }
+
+
+class APIClient(DataUpdateCoordinator[StationData]):
     """DataUpdateCoordinator for Braendstofpriser."""
 
     def __init__(
         self,
         hass,
-        api_key: str,
+        hub: BraendstofpriserHub,
         company: str,
         station: dict,
         products: dict,
         subentry_id: str,
+        priority: str = DEFAULT_PRIORITY,
     ) -> None:
         """Initialize the API client."""
+        # Refreshes are scheduled by the hub, so the coordinator has no own interval
         DataUpdateCoordinator.__init__(
             self,
             hass=hass,
             name=DOMAIN,
             logger=_LOGGER,
-            update_interval=SCAN_INTERVAL,
+            config_entry=hub.config_entry,
+            update_interval=None,
+            # Only notify entities when the station data actually changed
+            always_update=False,
         )
-        # if self.config_entry is None:
-        #     self.config_entry = config_entry
 
-        self._api = Braendstofpriser(api_key)
+        self.hub = hub
         self._hass = hass
         self.company: str = company
         self.station_id: int = station["id"]
-        self.station_name: str = station["name"]
+        self._station_name: str = station["name"]
         self.subentry_id: str = subentry_id
-        self._products: dict = products
-        self.products = {}
-        self.previous_devices: set[str] = set()
-        self.updated_at: datetime | None = None
-        self.stations = None
+        self.priority: str = priority
+        self.products: tuple[str, ...] = tuple(
+            product for product, selected in products.items() if selected
+        )
+        self.skipped_writes = 0
+        # Rolling statistics as of the last time the entities were notified
+        self._statistics: dict[str, dict[str, float] | None] = {}
+        # Last payload handed out by the price cache for this station
+        self._payload: dict | None = None
 
         self.name = self.company
 
-        for product, selected in self._products.items():
-            if selected:
-                self.products.update(
-                    {
-                        product: {
-                            "name": product,
-                            "price": None,
-                        }
-                    }
-                )
-
-    async def _async_setup(self) -> None:
-        """Initialize the API client."""
-        # data = await self._api.get_prices(self.station_id)
-        # self.station_name = data["station"]["name"]
-        _LOGGER.debug("Selected products: %s", self._products)
-        for product, selected in self._products.items():
-            if selected:
-                self.products.update(
-                    {
-                        product: {
-                            "name": product,
-                            "price": None,
-                        }
-                    }
-                )
-
-    async def _async_update_data(self) -> None:
+        # Bounded in-memory history of every product for rolling statistics
+        self.history: dict[str, PriceHistory] = {
+            product: PriceHistory(hub.history_windows) for product in self.products
+        }
+
+    @property
+    def station_name(self) -> str:
+        """Return the latest known name of the station."""
+        if self.data is None:
+            return self._station_name
+        return self.data.station_name
+
+    @property
+    def updated_at(self) -> datetime | None:
+        """Return when the station last changed its prices."""
+        if self.data is None:
+            return None
+        return self.data.updated_at
+
+    def as_history(self) -> dict[str, list[float]]:
+        """Return the price history of every product as flat lists."""
+        return {product: history.as_list() for product, history in self.history.items()}
+
+    @callback
+    def async_restore(
+        self, snapshot: dict[str, Any], history: dict[str, list[float]]
+    ) -> None:
+        """Seed the coordinator from a stored snapshot and price history."""
+        prices = snapshot.get("prices", {})
+        for product, samples in history.items():
+            if (product_history := self.history.get(product)) is not None:
+                product_history.extend(samples)
+        self.data = StationData(
+            station_name=snapshot.get("station_name", self._station_name),
+            updated_at=snapshot.get("updated_at"),
+            products=self.products,
+            prices=tuple(prices.get(product) for product in self.products),
+        )
+        self._statistics = self._all_statistics()
+
+    def _all_statistics(self) -> dict[str, dict[str, float] | None]:
+        """Return the rolling statistics of every product."""
+        return {product: self.statistics(product) for product in self.products}
+
+    def statistics(self, product: str) -> dict[str, float] | None:
+        """Return rolling min, max and time weighted mean prices of a product."""
+        if (history := self.history.get(product)) is None:
+            return None
+
+        now = dt_util.utcnow().timestamp()
+        attributes = {}
+        for window in history.windows:
+            if (stats := history.statistics(window, now)) is None:
+                continue
+            suffix = f"{window.days}d"
+            attributes[f"min_{suffix}"] = stats[0]
+            attributes[f"max_{suffix}"] = stats[1]
+            attributes[f"mean_{suffix}"] = round(stats[2], 3)
+        return attributes
+
+    @callback
+    def _async_unchanged(self) -> StationData:
+        """Return the data of a refresh that found no new prices.
+
+        Equal data doesn't reach the entities, so they are only notified when
+        a rolling statistic moved on with time.
+        """
+        if self.last_update_success:
+            if (statistics := self._all_statistics()) != self._statistics:
+                self._statistics = statistics
+                self.async_update_listeners()
+            else:
+                # Every entity skips its state write
+                self.skipped_writes += len(self._listeners)
+        return self.data
+
+    async def _async_update_data(self) -> StationData:
         """Handle data update request from the coordinator."""
         try:
-            data = await self._api.get_prices(self.station_id)
-            self.station_name = data["station"]["name"]
-            self.updated_at = (
-                datetime.fromisoformat(data["station"]["last_update"])
-                if not isinstance(data["station"]["last_update"], type(None))
+            data = await self.hub.async_get_prices(self.station_id)
+            if data is self._payload and self.data is not None:
+                # Same payload as this station's last refresh, nothing to fan out
+                return self._async_unchanged()
+            self._payload = data
+
+            station = data["station"]
+            updated_at = (
+                datetime.fromisoformat(last_update)
+                if (last_update := station.get("last_update")) is not None
                 else None
             )
+            prices = tuple(data["prices"].get(product) for product in self.products)
+            if (
+                self.data is not None
+                and self.data.updated_at == updated_at
+                and self.data.prices == prices
+                and self.data.station_name == station["name"]
+            ):
+                # A new payload, e.g. from the sweep, but the same prices as ours
+                return self._async_unchanged()
 
-            for product in self.products:
-                _LOGGER.debug(
-                    "Getting price for %s",
-                    product,
-                )
-                self.products[product]["price"] = data["prices"].get(product)
-                _LOGGER.debug(
-                    "Updated price for %s: %s",
-                    self.products[product]["name"],
-                    data["prices"].get(product),
-                )
-                _LOGGER.debug(
-                    "Updated at: %s",
-                    data["station"].get("last_update", "UNKNOWN"),
-                )
-        except ProductNotFoundError as exc:
-            raise ConfigEntryError(exc)
+            timestamp = (updated_at or dt_util.utcnow()).timestamp()
+            for product, price in zip(self.products, prices):
+                if price is not None:
+                    self.history[product].append(timestamp, price)
+            self._statistics = self._all_statistics()
+
+            _LOGGER.debug(
+                "Updated prices of %s, last updated %s: %s",
+                station["name"],
+                updated_at,
+                data["prices"],
+            )
+            return StationData(station["name"], updated_at, self.products, prices)
         except ClientResponseError as exc:
             if exc.status == 401:
                 raise ConfigEntryAuthFailed(exc)
+            if exc.status == 429 or exc.status >= 500:
+                # Still rate limited or failing after the scheduler's retries,
+                # try next cycle
+                raise UpdateFailed(exc)
             raise ConfigEntryError(exc)
+        except (ClientError, TimeoutError, ValueError) as exc:
+            # Connection problems, also while the entry unloads, and malformed
+            # responses are temporary
+            raise UpdateFailed(exc)
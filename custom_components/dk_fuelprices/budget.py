@@ -0,0 +1,158 @@
+"""Daily request budget for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from .keypool import KeyPool
+from .store import SnapshotStore
+
+
+class RequestBudget:
+    """Spread a daily request allowance over the stations by priority.
+
+    Every request sent with the entry's API keys counts against the allowance,
+    retries and failed requests included, so the plan tightens as soon as
+    requests are lost. The budget never makes a station poll faster than its
+    learned cadence, it only holds refreshes back.
+
+    The requests used today are kept in the snapshot store, so a restart or a
+    reload continues where the day left off.
+    """
+
+    def __init__(
+        self,
+        keys: KeyPool,
+        store: SnapshotStore,
+        daily_budget: int,
+        quiet_hours: tuple[time, time] | None = None,
+    ) -> None:
+        """Initialize the request budget."""
+        self._keys = keys
+        self._store = store
+        self.daily_budget = daily_budget
+        self.quiet_hours = quiet_hours
+        self._day: date | None = None
+        # Requests used today before the baseline was taken, as restored from disk
+        self._used = 0
+        self._baseline = self._requests()
+        if (stored := store.get_budget()) is not None:
+            self._day, self._used = stored
+
+    def _requests(self) -> int:
+        """Return the requests sent with the entry's API keys so far."""
+        return sum(key.scheduler.requests for key in self._keys.keys)
+
+    def used(self, now: datetime | None = None) -> int:
+        """Return the requests used today."""
+        day = dt_util.as_local(now or dt_util.utcnow()).date()
+        if day != self._day:
+            # A new day, with a new allowance
+            self._day = day
+            self._used = 0
+            self._baseline = self._requests()
+        return self._used + self._requests() - self._baseline
+
+    def remaining(self, now: datetime | None = None) -> int:
+        """Return the requests left for today."""
+        return max(0, self.daily_budget - self.used(now))
+
+    def _quiet_periods(self, day: date) -> list[tuple[datetime, datetime]]:
+        """Return the quiet periods within a local day."""
+        if self.quiet_hours is None or self.quiet_hours[0] == self.quiet_hours[1]:
+            return []
+
+        time_zone = dt_util.get_default_time_zone()
+        start = datetime.combine(day, self.quiet_hours[0], time_zone)
+        end = datetime.combine(day, self.quiet_hours[1], time_zone)
+        if start < end:
+            return [(start, end)]
+        # Quiet hours across midnight
+        return [
+            (dt_util.start_of_local_day(day), end),
+            (start, dt_util.start_of_local_day(day + timedelta(days=1))),
+        ]
+
+    def quiet_until(self, when: datetime) -> datetime | None:
+        """Return the end of the quiet period a time falls in."""
+        local = dt_util.as_local(when)
+        for start, end in self._quiet_periods(local.date()):
+            if start <= local < end:
+                return end
+        return None
+
+    def active_seconds(self, now: datetime) -> float:
+        """Return the seconds left today outside the quiet hours."""
+        local = dt_util.as_local(now)
+        end_of_day = dt_util.start_of_local_day(local.date() + timedelta(days=1))
+        seconds = (end_of_day - local).total_seconds()
+        for start, end in self._quiet_periods(local.date()):
+            overlap = min(end, end_of_day) - max(start, local)
+            seconds -= max(0.0, overlap.total_seconds())
+        return seconds
+
+    def interval(
+        self, weight: float, total_weight: float, now: datetime
+    ) -> timedelta | None:
+        """Return how often a station may be polled for the rest of today.
+
+        None when the allowance for today is spent.
+        """
+        if not (remaining := self.remaining(now)):
+            return None
+        polls = remaining * weight / total_weight
+        return timedelta(seconds=self.active_seconds(now) / polls)
+
+    def allows(self, requests: int, reserved: float, now: datetime) -> bool:
+        """Return if extra requests leave enough of today's budget in reserve."""
+        if self.quiet_until(now) is not None:
+            return False
+        return self.remaining(now) - requests >= reserved
+
+    @callback
+    def async_plan(
+        self,
+        next_refresh: datetime,
+        now: datetime,
+        weight: float,
+        total_weight: float,
+        spread: timedelta,
+    ) -> datetime:
+        """Return the refresh time that keeps a station within the budget."""
+        if (interval := self.interval(weight, total_weight, now)) is None:
+            # Nothing left, wait for tomorrow's allowance
+            tomorrow = dt_util.as_local(now).date() + timedelta(days=1)
+            next_refresh = max(
+                next_refresh, dt_util.start_of_local_day(tomorrow) + spread
+            )
+        else:
+            next_refresh = max(next_refresh, now + interval)
+
+        while (quiet_until := self.quiet_until(next_refresh)) is not None:
+            next_refresh = quiet_until + spread
+        self.async_save(now)
+        return next_refresh
+
+    @callback
+    def async_save(self, now: datetime | None = None) -> None:
+        """Store the requests used today."""
+        used = self.used(now)
+        if self._day is not None:
+            self._store.async_set_budget(self._day, used)
+
+    def as_dict(self, now: datetime | None = None) -> dict[str, Any]:
+        """Return the state of the budget."""
+        return {
+            "daily_budget": self.daily_budget,
+            "used": self.used(now),
+            "remaining": self.remaining(now),
+            "quiet_hours": (
+                [moment.isoformat() for moment in self.quiet_hours]
+                if self.quiet_hours
+                else None
+            ),
+        }
@@ -0,0 +1,67 @@
+"""Price change cadence tracking for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from .const import (
+    CADENCE_MARGIN,
+    CADENCE_SMOOTHING,
+    MAX_SCAN_INTERVAL,
+    MIN_SCAN_INTERVAL,
+)
+
+
+class PriceCadence:
+    """Learn how often prices change from successive last_update values."""
+
+    def __init__(self) -> None:
+        """Initialize the cadence tracker."""
+        self.last_change: datetime | None = None
+        self.interval: timedelta | None = None
+        self.quiet_polls = 0
+
+    def add_interval(self, interval: timedelta) -> None:
+        """Fold an observed interval between two price changes into the average."""
+        if self.interval is None:
+            self.interval = interval
+        else:
+            self.interval = interval * CADENCE_SMOOTHING + self.interval * (
+                1 - CADENCE_SMOOTHING
+            )
+
+    def observe(self, last_update: datetime | None) -> timedelta | None:
+        """Record a polled last_update and return the interval if it changed."""
+        if last_update is None:
+            return None
+
+        if self.last_change is None:
+            self.last_change = last_update
+            return None
+
+        if last_update <= self.last_change:
+            self.quiet_polls += 1
+            return None
+
+        interval = last_update - self.last_change
+        self.last_change = last_update
+        self.quiet_polls = 0
+        self.add_interval(interval)
+        return interval
+
+    def next_delay(
+        self, now: datetime, fallback: timedelta | None = None
+    ) -> timedelta | None:
+        """Return how long to wait before polling again, if the cadence is known."""
+        interval = self.interval or fallback
+        if interval is None or self.last_change is None:
+            return None
+
+        expected = self.last_change + interval + CADENCE_MARGIN
+        if expected > now:
+            delay = expected - now
+        else:
+            # The expected change is overdue, back off while the station is quiet
+            delay = MIN_SCAN_INTERVAL * 2 ** min(self.quiet_polls, 8)
+
+        return max(MIN_SCAN_INTERVAL, min(MAX_SCAN_INTERVAL, delay))
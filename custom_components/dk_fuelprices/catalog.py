@@ -0,0 +1,208 @@
+"""Shared catalog of companies, stations and products for dk_fuelprices."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientResponseError
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CATALOG_SAVE_DELAY,
+    CATALOG_STORAGE_VERSION,
+    CATALOG_TTL,
+    DATA_CATALOG,
+    DOMAIN,
+)
+from .geo import SpatialIndex
+from .ratelimit import RequestScheduler
+from .station_index import StationIndex
+
+if TYPE_CHECKING:
+    from pybraendstofpriser import Braendstofpriser, Flist
+
+_LOGGER = logging.getLogger(__name__)
+
+COMPANIES = "companies"
+STATIONS = "stations"
+PRODUCTS = "products"
+
+
+class Catalog:
+    """TTL cache of catalog lookups, persisted to disk and shared by all flows."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the catalog."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, CATALOG_STORAGE_VERSION, f"{DOMAIN}.catalog"
+        )
+        self._data: dict[str, dict[str, Any]] = {
+            COMPANIES: {},
+            STATIONS: {},
+            PRODUCTS: {},
+        }
+        self._lock = asyncio.Lock()
+        self._indexes: dict[str, tuple[float, StationIndex]] = {}
+        self._spatial: tuple[tuple[float, ...], SpatialIndex] | None = None
+
+    async def async_load(self) -> None:
+        """Load the catalog from disk."""
+        if stored := await self._store.async_load():
+            for kind in self._data:
+                self._data[kind] = stored.get(kind, {})
+
+    @callback
+    def async_invalidate(self, kind: str | None = None, key: Any = None) -> None:
+        """Drop cached entries, either everything, one kind or a single key."""
+        if kind is None:
+            for entries in self._data.values():
+                entries.clear()
+        elif key is None:
+            self._data[kind].clear()
+        else:
+            self._data[kind].pop(str(key), None)
+        self._store.async_delay_save(lambda: self._data, CATALOG_SAVE_DELAY)
+
+    async def _async_get(
+        self,
+        kind: str,
+        key: Any,
+        fetch: Callable[[], Awaitable[Any]],
+        force: bool,
+    ) -> Any:
+        """Return a cached value, fetching it when missing or expired."""
+        key = str(key)
+        async with self._lock:
+            cached = self._data[kind].get(key)
+            if (
+                not force
+                and cached is not None
+                and time.time() - cached["fetched"] < CATALOG_TTL.total_seconds()
+            ):
+                return cached["items"]
+
+            try:
+                items = await fetch()
+            except ClientResponseError as exc:
+                if exc.status == 401 or cached is None:
+                    raise
+                _LOGGER.debug(
+                    "Using stale %s catalog for %s after error: %s", kind, key, exc
+                )
+                return cached["items"]
+
+            self._data[kind][key] = {"fetched": time.time(), "items": items}
+            self._store.async_delay_save(lambda: self._data, CATALOG_SAVE_DELAY)
+            return items
+
+    async def async_get_companies(
+        self,
+        api: Braendstofpriser,
+        scheduler: RequestScheduler,
+        force: bool = False,
+    ) -> Flist:
+        """Return the list of companies."""
+        from pybraendstofpriser import Flist
+
+        return Flist(
+            await self._async_get(
+                COMPANIES,
+                COMPANIES,
+                lambda: scheduler.async_run(api.list_companies),
+                force,
+            )
+        )
+
+    async def async_get_stations(
+        self,
+        api: Braendstofpriser,
+        scheduler: RequestScheduler,
+        company: str,
+        force: bool = False,
+    ) -> Flist:
+        """Return the list of stations for a company."""
+        from pybraendstofpriser import Flist
+
+        return Flist(
+            await self._async_get(
+                STATIONS,
+                company,
+                lambda: scheduler.async_run(api.list_stations, company_name=company),
+                force,
+            )
+        )
+
+    async def async_get_station_index(
+        self,
+        api: Braendstofpriser,
+        scheduler: RequestScheduler,
+        company: str,
+    ) -> StationIndex:
+        """Return a search index over the stations of a company."""
+        stations = await self.async_get_stations(api, scheduler, company)
+        fetched = self._data[STATIONS].get(company, {}).get("fetched", 0.0)
+
+        # Only rebuild the index when the underlying station list was refetched
+        cached = self._indexes.get(company)
+        if cached is None or cached[0] != fetched:
+            cached = self._indexes[company] = (fetched, StationIndex(stations))
+        return cached[1]
+
+    async def async_get_spatial_index(
+        self,
+        api: Braendstofpriser,
+        scheduler: RequestScheduler,
+    ) -> SpatialIndex:
+        """Return a spatial index over the stations of every company."""
+        companies = [
+            c["company"] for c in await self.async_get_companies(api, scheduler)
+        ]
+        stations = [
+            (company, await self.async_get_stations(api, scheduler, company))
+            for company in companies
+        ]
+        fetched = tuple(
+            self._data[STATIONS].get(company, {}).get("fetched", 0.0)
+            for company in companies
+        )
+
+        # Only rebuild the index when one of the station lists was refetched
+        if self._spatial is None or self._spatial[0] != fetched:
+            self._spatial = (
+                fetched,
+                SpatialIndex(
+                    (company, station)
+                    for company, company_stations in stations
+                    for station in company_stations
+                ),
+            )
+        return self._spatial[1]
+
+    async def async_get_products(
+        self,
+        api: Braendstofpriser,
+        scheduler: RequestScheduler,
+        station_id: int,
+        force: bool = False,
+    ) -> list[str]:
+        """Return the product keys available at a station."""
+
+        async def _async_fetch() -> list[str]:
+            data = await scheduler.async_run(api.get_prices, station_id)
+            return list(data["prices"])
+
+        return await self._async_get(PRODUCTS, station_id, _async_fetch, force)
+
+
+async def async_get_catalog(hass: HomeAssistant) -> Catalog:
+    """Return the shared catalog, loading it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (catalog := domain_data.get(DATA_CATALOG)) is None:
+        catalog = domain_data[DATA_CATALOG] = Catalog(hass)
+        await catalog.async_load()
+    return catalog
@@ -0,0 +1,65 @@
+"""Pooled HTTP access to the Fuelprices.dk API for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientConnectionError, ClientSession, ClientTimeout
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+if TYPE_CHECKING:
+    from pybraendstofpriser import Braendstofpriser
+
+
+class SessionConnector:
+    """Connector sending requests through a shared aiohttp session.
+
+    Stands in for the library connector, which opens a new session, and so a
+    new connection pool, for every request.
+    """
+
+    def __init__(
+        self, apikey: str, session: ClientSession, base_url: str, timeout: float
+    ) -> None:
+        """Initialize the connector."""
+        self.apikey = apikey
+        self._session = session
+        self._base_url = base_url
+        self._timeout = ClientTimeout(total=timeout)
+        self.closed = False
+
+    def close(self) -> None:
+        """Refuse further requests.
+
+        The session is shared with Home Assistant, which closes it on shutdown.
+        """
+        self.closed = True
+
+    async def fetch_data(self, endpoint: str, args: dict | None = None) -> Any:
+        """Fetch data from the specified endpoint."""
+        if self.closed:
+            raise ClientConnectionError("Connector is closed")
+
+        async with self._session.get(
+            f"{self._base_url}{endpoint}",
+            params=args,
+            headers={"X-API-KEY": self.apikey},
+            timeout=self._timeout,
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+
+@callback
+def async_create_client(hass: HomeAssistant, api_key: str) -> Braendstofpriser:
+    """Return an API client using Home Assistant's shared client session."""
+    # The library is only needed once a client is, not to load the integration
+    from pybraendstofpriser import Braendstofpriser
+    from pybraendstofpriser.const import API_ENDPOINT, API_TIMEOUT
+
+    client = Braendstofpriser(api_key)
+    client.conn = SessionConnector(
+        api_key, async_get_clientsession(hass), API_ENDPOINT, API_TIMEOUT
+    )
+    return client
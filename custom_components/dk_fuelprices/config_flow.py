@@ -3,17 +3,58 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import voluptuous as vol
 from aiohttp import ClientResponseError
 from homeassistant import config_entries
-from homeassistant.const import CONF_API_KEY
+from homeassistant.const import CONF_API_KEY, CONF_LOCATION
 from homeassistant.core import callback
-from pybraendstofpriser import Braendstofpriser
-
-from . import async_setup_entry, async_unload_entry
-from .const import CONF_COMPANY, CONF_PRODUCTS, CONF_STATION, DOMAIN,WEBSITE_URL
+from homeassistant.helpers import selector
+
+from .catalog import async_get_catalog
+from .client import async_create_client
+from .const import (
+    CONF_API_KEYS,
+    CONF_CLEAR_CATALOG,
+    CONF_COMPANY,
+    CONF_DAILY_BUDGET,
+    CONF_EVENT_DEBOUNCE,
+    CONF_HISTORY_WINDOWS,
+    CONF_METRICS,
+    CONF_NEARBY_COUNT,
+    CONF_PRIORITY,
+    CONF_PRODUCTS,
+    CONF_QUIET_END,
+    CONF_QUIET_START,
+    CONF_REQUESTS_PER_MINUTE,
+    CONF_SEARCH,
+    CONF_SETUP_CONCURRENCY,
+    CONF_STATION,
+    CONF_STATISTICS,
+    CONF_SWEEP_BATCH,
+    CONF_SWEEP_RADIUS,
+    DEFAULT_DAILY_BUDGET,
+    DEFAULT_EVENT_DEBOUNCE,
+    DEFAULT_HISTORY_WINDOWS,
+    DEFAULT_NEARBY_COUNT,
+    DEFAULT_PRIORITY,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_SETUP_CONCURRENCY,
+    DEFAULT_SWEEP_BATCH,
+    DEFAULT_SWEEP_RADIUS,
+    DOMAIN,
+    HISTORY_WINDOWS,
+    STATION_PRIORITIES,
+    STATION_SEARCH_LIMIT,
+    STATION_SEARCH_THRESHOLD,
+    WEBSITE_URL,
+)
+from .ratelimit import RequestScheduler, async_get_scheduler
+from .station_index import StationIndex
+
+if TYPE_CHECKING:
+    from pybraendstofpriser import Braendstofpriser
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,11 +73,21 @@ class BraendstofpriserConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Return subentries supported by this handler."""
         return {"station": BraendstofpriserStationSubentryFlow}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> BraendstofpriserOptionsFlow:
+        """Get the options flow for this handler."""
+        return BraendstofpriserOptionsFlow()
+
     def __init__(self) -> None:
         """Initialize the config flow."""
         self.api: Braendstofpriser
+        self._scheduler: RequestScheduler
         self.companies = {}
-        self.stations = {}
+        self.stations: StationIndex
+        self.candidates: list[dict] = []
         self.company_name = ""
         self._errors = {}
         self.user_input = {}
@@ -50,8 +101,15 @@ class BraendstofpriserConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             # Test API key
             try:
                 # Initialize API
-                self.api = Braendstofpriser(user_input[CONF_API_KEY])
-                self.companies = await self.api.list_companies()
+                self.api = async_create_client(self.hass, user_input[CONF_API_KEY])
+                self._scheduler = async_get_scheduler(
+                    self.hass, user_input[CONF_API_KEY]
+                )
+                # Always ask the API here, as this also validates the key
+                catalog = await async_get_catalog(self.hass)
+                self.companies = await catalog.async_get_companies(
+                    self.api, self._scheduler, force=True
+                )
             except ClientResponseError as exc:  # pylint: disable=broad-except
                 if exc.status == 401:
                     self._errors["base"] = "invalid_api_key"
@@ -86,7 +144,7 @@ class BraendstofpriserConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             # Process the user input and show next selection form
             self.company_name = user_input[CONF_COMPANY]
             self.user_input.update(user_input)
-            return await self.async_step_station_selection()
+            return await self.async_step_station_search()
 
         if len(self.companies) == 0:
             return self.async_abort(reason="rate_limit_exceeded")
@@ -104,30 +162,54 @@ class BraendstofpriserConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=self._errors,
         )
 
+    async def async_step_station_search(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Handle narrowing down the station list with a search."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            self.candidates = self.stations.search(
+                user_input[CONF_SEARCH], STATION_SEARCH_LIMIT
+            )
+            if self.candidates:
+                return await self.async_step_station_selection()
+            errors["base"] = "no_stations_found"
+        else:
+            catalog = await async_get_catalog(self.hass)
+            self.stations = await catalog.async_get_station_index(
+                self.api, self._scheduler, self.company_name
+            )
+            if len(self.stations) <= STATION_SEARCH_THRESHOLD:
+                self.candidates = self.stations.search("")
+                return await self.async_step_station_selection()
+
+        # Show the form to the user
+        return self.async_show_form(
+            step_id="station_search",
+            data_schema=vol.Schema({vol.Required(CONF_SEARCH): str}),
+            errors=errors,
+        )
+
     async def async_step_station_selection(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.ConfigFlowResult:
         """Handle the station selection step."""
         if user_input is not None:
-            # Match station name to station ID
-            user_input[CONF_STATION] = self.stations.find(
-                "name", user_input[CONF_STATION]
-            )
+            # Look up the selected station by its ID
+            user_input[CONF_STATION] = self.stations.get(user_input[CONF_STATION])
 
             # Process the user input and show next selection form
             self.user_input.update(user_input)
             return await self.async_step_product_selection()
 
-        # Get station list, sort it and make a list with only names
-        self.stations = await self.api.list_stations(company_name=self.company_name)
-        stations = list(s["name"] for s in self.stations)
-
         # Show the form to the user
         return self.async_show_form(
             step_id="station_selection",
             data_schema=vol.Schema(
                 {
-                    vol.Required(CONF_STATION): vol.In(list(stations)),
+                    vol.Required(CONF_STATION): vol.In(
+                        StationIndex.options(self.candidates)
+                    ),
                 }
             ),
             errors=self._errors,
@@ -151,8 +233,9 @@ class BraendstofpriserConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         try:
             # Get available products and translate the system names to human readable
-            products_available = await self.api.get_prices(
-                self.user_input[CONF_STATION]["id"]
+            catalog = await async_get_catalog(self.hass)
+            products_available = await catalog.async_get_products(
+                self.api, self._scheduler, self.user_input[CONF_STATION]["id"]
             )
         except ClientResponseError as exc:  # pylint: disable=broad-except
             if exc.status == 429:
@@ -164,7 +247,7 @@ class BraendstofpriserConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         # Create a list of available products
         schema = {}
-        for prod in products_available["prices"].keys():
+        for prod in products_available:
             schema.update({vol.Required(prod): bool})
 
         # Show the form to the user
@@ -187,8 +270,9 @@ class BraendstofpriserConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Confirm a new API key."""
         if user_input is not None:
             try:
-                api = Braendstofpriser(user_input[CONF_API_KEY])
-                await api.list_companies()
+                api = async_create_client(self.hass, user_input[CONF_API_KEY])
+                scheduler = async_get_scheduler(self.hass, user_input[CONF_API_KEY])
+                await scheduler.async_run(api.list_companies)
             except ClientResponseError as exc:  # pylint: disable=broad-except
                 if exc.status == 401:
                     self._errors["base"] = "invalid_api_key"
@@ -218,14 +302,138 @@ class BraendstofpriserConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class BraendstofpriserOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for dk_fuelprices."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the integration options."""
+        errors = {}
+        if user_input is not None:
+            errors = await self._async_validate_api_keys(user_input)
+            if not errors:
+                if user_input.pop(CONF_CLEAR_CATALOG, False):
+                    catalog = await async_get_catalog(self.hass)
+                    catalog.async_invalidate()
+                return self.async_create_entry(data=user_input)
+
+        options = user_input or self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_SETUP_CONCURRENCY,
+                        default=options.get(
+                            CONF_SETUP_CONCURRENCY, DEFAULT_SETUP_CONCURRENCY
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=50)),
+                    vol.Required(
+                        CONF_REQUESTS_PER_MINUTE,
+                        default=options.get(
+                            CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+                    vol.Required(
+                        CONF_DAILY_BUDGET,
+                        default=options.get(CONF_DAILY_BUDGET, DEFAULT_DAILY_BUDGET),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000000)),
+                    vol.Optional(
+                        CONF_QUIET_START,
+                        description={"suggested_value": options.get(CONF_QUIET_START)},
+                    ): selector.TimeSelector(),
+                    vol.Optional(
+                        CONF_QUIET_END,
+                        description={"suggested_value": options.get(CONF_QUIET_END)},
+                    ): selector.TimeSelector(),
+                    vol.Required(
+                        CONF_SWEEP_RADIUS,
+                        default=options.get(CONF_SWEEP_RADIUS, DEFAULT_SWEEP_RADIUS),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+                    vol.Required(
+                        CONF_SWEEP_BATCH,
+                        default=options.get(CONF_SWEEP_BATCH, DEFAULT_SWEEP_BATCH),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=200)),
+                    vol.Required(
+                        CONF_HISTORY_WINDOWS,
+                        default=options.get(
+                            CONF_HISTORY_WINDOWS, DEFAULT_HISTORY_WINDOWS
+                        ),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=HISTORY_WINDOWS,
+                            multiple=True,
+                            translation_key=CONF_HISTORY_WINDOWS,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_EVENT_DEBOUNCE,
+                        default=options.get(
+                            CONF_EVENT_DEBOUNCE, DEFAULT_EVENT_DEBOUNCE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=600)),
+                    vol.Required(
+                        CONF_STATISTICS,
+                        default=options.get(CONF_STATISTICS, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_METRICS,
+                        default=options.get(CONF_METRICS, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_API_KEYS, default=options.get(CONF_API_KEYS, [])
+                    ): selector.TextSelector(
+                        selector.TextSelectorConfig(
+                            type=selector.TextSelectorType.PASSWORD, multiple=True
+                        )
+                    ),
+                    vol.Optional(CONF_CLEAR_CATALOG, default=False): bool,
+                }
+            ),
+            errors=errors,
+        )
+
+    async def _async_validate_api_keys(self, user_input: dict[str, Any]) -> dict:
+        """Drop duplicate extra API keys and check the newly added ones."""
+        primary = self.config_entry.data.get(CONF_API_KEY)
+        api_keys = [
+            api_key
+            for api_key in dict.fromkeys(
+                api_key.strip() for api_key in user_input.get(CONF_API_KEYS, [])
+            )
+            if api_key and api_key != primary
+        ]
+        user_input[CONF_API_KEYS] = api_keys
+
+        known = set(self.config_entry.options.get(CONF_API_KEYS, []))
+        for api_key in api_keys:
+            if api_key in known:
+                continue
+            try:
+                api = async_create_client(self.hass, api_key)
+                scheduler = async_get_scheduler(self.hass, api_key)
+                await scheduler.async_run(api.list_companies)
+            except ClientResponseError as exc:
+                if exc.status == 401:
+                    return {CONF_API_KEYS: "invalid_api_key"}
+                if exc.status == 429:
+                    return {"base": "rate_limit_exceeded"}
+                return {"base": "cannot_connect"}
+        return {}
+
+
 class BraendstofpriserStationSubentryFlow(config_entries.ConfigSubentryFlow):
     """Handle station subentries for dk_fuelprices."""
 
     def __init__(self) -> None:
         """Initialize the subentry flow."""
         self.api: Braendstofpriser
+        self._scheduler: RequestScheduler
         self.companies = {}
-        self.stations = {}
+        self.stations: StationIndex
+        self.candidates: list[dict] = []
+        self.nearby: dict[str, tuple[float, str, dict]] = {}
         self.company_name = ""
         self._errors = {}
         self.user_input: dict[str, Any] = {}
@@ -236,7 +444,12 @@ class BraendstofpriserStationSubentryFlow(config_entries.ConfigSubentryFlow):
     ) -> config_entries.SubentryFlowResult:
         """Handle the initial step for adding a station subentry."""
         await self._async_init_api()
-        return await self.async_step_company_selection(user_input)
+        if self._errors:
+            return self.async_abort(reason=self._errors["base"])
+
+        return self.async_show_menu(
+            step_id="user", menu_options=["company_selection", "nearby_search"]
+        )
 
     async def async_step_reconfigure(
         self, user_input: dict[str, Any] | None = None
@@ -257,8 +470,12 @@ class BraendstofpriserStationSubentryFlow(config_entries.ConfigSubentryFlow):
             return
 
         try:
-            self.api = Braendstofpriser(api_key)
-            self.companies = await self.api.list_companies()
+            self.api = async_create_client(self.hass, api_key)
+            self._scheduler = async_get_scheduler(self.hass, api_key)
+            catalog = await async_get_catalog(self.hass)
+            self.companies = await catalog.async_get_companies(
+                self.api, self._scheduler
+            )
         except ClientResponseError as exc:  # pylint: disable=broad-except
             if exc.status == 401:
                 self._errors["base"] = "invalid_api_key"
@@ -278,7 +495,7 @@ class BraendstofpriserStationSubentryFlow(config_entries.ConfigSubentryFlow):
             # Process the user input and show next selection form
             self.company_name = user_input[CONF_COMPANY]
             self.user_input.update(user_input)
-            return await self.async_step_station_selection()
+            return await self.async_step_station_search()
 
         if len(self.companies) == 0:
             return self.async_abort(reason="rate_limit_exceeded")
@@ -301,41 +518,61 @@ class BraendstofpriserStationSubentryFlow(config_entries.ConfigSubentryFlow):
             errors=self._errors,
         )
 
+    async def async_step_station_search(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.SubentryFlowResult:
+        """Handle narrowing down the station list with a search."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            self.candidates = self.stations.search(
+                user_input[CONF_SEARCH], STATION_SEARCH_LIMIT
+            )
+            if self.candidates:
+                return await self.async_step_station_selection()
+            errors["base"] = "no_stations_found"
+        else:
+            catalog = await async_get_catalog(self.hass)
+            self.stations = await catalog.async_get_station_index(
+                self.api, self._scheduler, self.company_name
+            )
+            if len(self.stations) <= STATION_SEARCH_THRESHOLD:
+                self.candidates = self.stations.search("")
+                return await self.async_step_station_selection()
+
+        # Show the form to the user
+        return self.async_show_form(
+            step_id="station_search",
+            data_schema=vol.Schema({vol.Required(CONF_SEARCH): str}),
+            errors=errors,
+        )
+
     async def async_step_station_selection(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.SubentryFlowResult:
         """Handle the station selection step."""
         if user_input is not None:
-            # Match station name to station ID
-            user_input[CONF_STATION] = self.stations.find(
-                "name", user_input[CONF_STATION]
-            )
+            # Look up the selected station by its ID
+            user_input[CONF_STATION] = self.stations.get(user_input[CONF_STATION])
 
-            # Set UniqueID and abort if already existing
-            unique_id = f"{self.user_input[CONF_COMPANY]}_{user_input[CONF_STATION]['id']}"
-            entry = self._get_entry()
-            for subentry in entry.subentries.values():
-                if subentry.unique_id == unique_id:
-                    if not self._reconfigure or (
-                        subentry.subentry_id != self._reconfigure_subentry_id
-                    ):
-                        return self.async_abort(reason="already_configured")
+            # Abort if already existing
+            if self._is_configured(
+                self.user_input[CONF_COMPANY], user_input[CONF_STATION]
+            ):
+                return self.async_abort(reason="already_configured")
 
             # Process the user input and show next selection form
             self.user_input.update(user_input)
             return await self.async_step_product_selection()
 
-        # Get station list, sort it and make a list with only names
-        self.stations = await self.api.list_stations(company_name=self.company_name)
-        stations = list(s["name"] for s in self.stations)
+        options = StationIndex.options(self.candidates)
 
-        default_station_name = None
+        default_station_id = None
         if self._reconfigure and self.user_input.get(CONF_STATION):
-            default_station_name = self.user_input[CONF_STATION].get("name")
+            default_station_id = str(self.user_input[CONF_STATION].get("id"))
 
         station_field = (
-            vol.Required(CONF_STATION, default=default_station_name)
-            if default_station_name
+            vol.Required(CONF_STATION, default=default_station_id)
+            if default_station_id in options
             else vol.Required(CONF_STATION)
         )
 
@@ -344,22 +581,111 @@ class BraendstofpriserStationSubentryFlow(config_entries.ConfigSubentryFlow):
             step_id="station_selection",
             data_schema=vol.Schema(
                 {
-                    station_field: vol.In(list(stations)),
+                    station_field: vol.In(options),
+                }
+            ),
+            errors=self._errors,
+        )
+
+    async def async_step_nearby_search(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.SubentryFlowResult:
+        """Handle looking up the stations closest to a location."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                catalog = await async_get_catalog(self.hass)
+                index = await catalog.async_get_spatial_index(
+                    self.api, self._scheduler
+                )
+            except ClientResponseError as exc:  # pylint: disable=broad-except
+                if exc.status == 429:
+                    return self.async_abort(reason="rate_limit_exceeded")
+                return self.async_abort(reason="cannot_connect")
+
+            location = user_input[CONF_LOCATION]
+            self.nearby = {
+                f"{company}_{station['id']}": (distance, company, station)
+                for distance, company, station in index.nearest(
+                    location["latitude"],
+                    location["longitude"],
+                    int(user_input[CONF_NEARBY_COUNT]),
+                )
+            }
+            if self.nearby:
+                return await self.async_step_nearby_selection()
+            errors["base"] = "no_stations_found"
+
+        # Show the form to the user, starting out at the home zone
+        return self.async_show_form(
+            step_id="nearby_search",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_LOCATION,
+                        default={
+                            "latitude": self.hass.config.latitude,
+                            "longitude": self.hass.config.longitude,
+                        },
+                    ): selector.LocationSelector(),
+                    vol.Required(
+                        CONF_NEARBY_COUNT, default=DEFAULT_NEARBY_COUNT
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=50)),
                 }
             ),
+            errors=errors,
+        )
+
+    async def async_step_nearby_selection(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.SubentryFlowResult:
+        """Handle picking one of the nearby stations."""
+        if user_input is not None:
+            _, company, station = self.nearby[user_input[CONF_STATION]]
+
+            # Abort if already existing
+            if self._is_configured(company, station):
+                return self.async_abort(reason="already_configured")
+
+            self.company_name = company
+            self.user_input.update({CONF_COMPANY: company, CONF_STATION: station})
+            return await self.async_step_product_selection()
+
+        options = {
+            key: f"{company} - {station.get('name')} ({distance:.1f} km)"
+            for key, (distance, company, station) in self.nearby.items()
+        }
+
+        # Show the form to the user
+        return self.async_show_form(
+            step_id="nearby_selection",
+            data_schema=vol.Schema({vol.Required(CONF_STATION): vol.In(options)}),
             errors=self._errors,
         )
 
+    def _is_configured(self, company: str, station: dict) -> bool:
+        """Return whether another subentry already tracks this station."""
+        unique_id = f"{company}_{station['id']}"
+        current = (
+            self._get_reconfigure_subentry().subentry_id if self._reconfigure else None
+        )
+        return any(
+            subentry.unique_id == unique_id and subentry.subentry_id != current
+            for subentry in self._get_entry().subentries.values()
+        )
+
     async def async_step_product_selection(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.SubentryFlowResult:
         """Handle the product selection step."""
         if user_input is not None:
             # Process the user input and create/update the subentry
+            priority = user_input.pop(CONF_PRIORITY, DEFAULT_PRIORITY)
             subentry_data = {
                 CONF_COMPANY: self.user_input[CONF_COMPANY],
                 CONF_STATION: self.user_input[CONF_STATION],
                 CONF_PRODUCTS: user_input,
+                CONF_PRIORITY: priority,
             }
             unique_id = (
                 f"{self.user_input[CONF_COMPANY]}_{self.user_input[CONF_STATION]['id']}"
@@ -369,20 +695,16 @@ class BraendstofpriserStationSubentryFlow(config_entries.ConfigSubentryFlow):
                 f"{self.user_input[CONF_STATION]['name']}"
             )
 
+            # The entry's update listener sets up only the changed station
             if self._reconfigure:
-                entry = self._get_entry()
-                subentry = self._get_reconfigure_subentry()
-                self.hass.config_entries.async_schedule_reload(entry.entry_id)
                 return self.async_update_and_abort(
-                    entry,
-                    subentry,
+                    self._get_entry(),
+                    self._get_reconfigure_subentry(),
                     data=subentry_data,
                     title=title,
                     unique_id=unique_id,
                 )
 
-            entry = self._get_entry()
-            self.hass.config_entries.async_schedule_reload(entry.entry_id)
             return self.async_create_entry(
                 title=title,
                 data=subentry_data,
@@ -391,8 +713,9 @@ class BraendstofpriserStationSubentryFlow(config_entries.ConfigSubentryFlow):
 
         try:
             # Get available products and translate the system names to human readable
-            products_available = await self.api.get_prices(
-                self.user_input[CONF_STATION]["id"]
+            catalog = await async_get_catalog(self.hass)
+            products_available = await catalog.async_get_products(
+                self.api, self._scheduler, self.user_input[CONF_STATION]["id"]
             )
         except ClientResponseError as exc:  # pylint: disable=broad-except
             if exc.status == 429:
@@ -406,10 +729,22 @@ class BraendstofpriserStationSubentryFlow(config_entries.ConfigSubentryFlow):
 
         # Create a list of available products
         schema = {}
-        for prod in products_available["prices"].keys():
+        for prod in products_available:
             schema.update(
                 {vol.Required(prod, default=product_options.get(prod, False)): bool}
             )
+        schema[
+            vol.Required(
+                CONF_PRIORITY,
+                default=self.user_input.get(CONF_PRIORITY, DEFAULT_PRIORITY),
+            )
+        ] = selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=list(STATION_PRIORITIES),
+                mode=selector.SelectSelectorMode.DROPDOWN,
+                translation_key=CONF_PRIORITY,
+            )
+        )
 
         # Show the form to the user
         return self.async_show_form(
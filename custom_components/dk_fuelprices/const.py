@@ -1,5 +1,7 @@
 """Constants for the dk_fuelprices integration."""
 
+from datetime import timedelta
+
 # Startup banner
 STARTUP = """
 -------------------------------------------------------------------
@@ -14,10 +16,104 @@ https://github.com/mtrab/dk_fuelprices/issues
 
 DOMAIN = "dk_fuelprices"
 
+CONF_API_KEYS = "api_keys"
+CONF_CLEAR_CATALOG = "clear_catalog"
 CONF_COMPANY = "company"
+CONF_DAILY_BUDGET = "daily_budget"
+CONF_EVENT_DEBOUNCE = "event_debounce"
+CONF_HISTORY_WINDOWS = "history_windows"
+CONF_METRICS = "metrics"
+CONF_NEARBY_COUNT = "count"
+CONF_PRIORITY = "priority"
 CONF_PRODUCTS = "products"
+CONF_QUIET_END = "quiet_end"
+CONF_QUIET_START = "quiet_start"
 CONF_STATION = "station"
+CONF_STATISTICS = "statistics"
+CONF_REQUESTS_PER_MINUTE = "requests_per_minute"
+CONF_SEARCH = "search"
+CONF_SETUP_CONCURRENCY = "setup_concurrency"
+CONF_SWEEP_BATCH = "sweep_batch"
+CONF_SWEEP_RADIUS = "sweep_radius"
+
+# Maximum number of stations refreshed at the same time during setup
+DEFAULT_SETUP_CONCURRENCY = 4
 
+ATTR_CONFIG = "config"
 ATTR_COORDINATOR = "coordinator"
+ATTR_ENTITIES = "entities"
+ATTR_HUB = "hub"
+ATTR_SWEEP = "sweep"
+
+# Fired once per refresh cycle with every price that changed
+EVENT_PRICE_CHANGED = f"{DOMAIN}_price_changed"
+DEFAULT_EVENT_DEBOUNCE = 10  # seconds
+
+# Dispatched with a subentry ID when its sensors should be added
+SIGNAL_ADD_SUBENTRY = f"{DOMAIN}_add_subentry_{{}}"
+
+DATA_CATALOG = "catalog"
+DATA_SCHEDULERS = "schedulers"
+DATA_SNAPSHOT_STORES = "snapshot_stores"
+
+# Cached catalog of companies, stations and products used by the config flows
+CATALOG_STORAGE_VERSION = 1
+CATALOG_SAVE_DELAY = 10  # seconds
+CATALOG_TTL = timedelta(days=1)
+
+# Companies with more stations than this get a search step before station selection
+STATION_SEARCH_THRESHOLD = 30
+STATION_SEARCH_LIMIT = 50
+
+# Nearby station lookup across all companies
+DEFAULT_NEARBY_COUNT = 10
+GEO_CELL_SIZE = 0.1  # degrees
+
+# Regional sweep for the cheapest prices around the home zone, off by default
+DEFAULT_SWEEP_RADIUS = 0  # km
+DEFAULT_SWEEP_BATCH = 25
+SWEEP_CONCURRENCY = 4
+SWEEP_INTERVAL = timedelta(minutes=15)
+SWEEP_MAX_STATIONS = 500
+
+# Rolling price statistics kept in memory, windows in days
+HISTORY_CAPACITY = 1024  # samples per product
+HISTORY_WINDOWS = ["1", "7", "30"]
+DEFAULT_HISTORY_WINDOWS = ["1", "7"]
+
+# Persisted station snapshots used to populate sensors before the first refresh
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30  # seconds
+HISTORY_SAVE_DELAY = 300  # seconds
+
+# Request scheduling towards the Fuelprices.dk API
+DEFAULT_REQUESTS_PER_MINUTE = 30
+API_BURST = 5
+API_MAX_RETRIES = 5
+API_BACKOFF_BASE = 2.0  # seconds
+API_BACKOFF_MAX = 300.0  # seconds
+
+# Daily request budget spread over the stations by priority, off by default
+DEFAULT_DAILY_BUDGET = 0
+STATION_PRIORITIES = {"low": 1, "normal": 2, "high": 4}
+DEFAULT_PRIORITY = "normal"
+
+# Request and refresh metrics, off by default
+METRICS_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRICS_SCAN_INTERVAL = timedelta(minutes=1)
+
+# How often each station is refreshed, and how often the hub checks for due stations
+SCAN_INTERVAL = timedelta(hours=1)
+TICK_INTERVAL = timedelta(minutes=1)
+
+# Bounds for the adaptive refresh interval learned from price change cadence
+MIN_SCAN_INTERVAL = timedelta(minutes=10)
+MAX_SCAN_INTERVAL = timedelta(hours=4)
+CADENCE_MARGIN = timedelta(minutes=2)
+CADENCE_SMOOTHING = 0.3
+
+# Spreading of station refreshes, so they don't all fire at once
+PHASE_SPREAD = timedelta(minutes=10)
+POLL_JITTER = timedelta(seconds=30)
 
 WEBSITE_URL = "https://fuelprices.dk"
@@ -0,0 +1,40 @@
+"""Diagnostics support for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+
+from .const import ATTR_HUB, ATTR_SWEEP, CONF_API_KEYS, DOMAIN
+
+TO_REDACT = {CONF_API_KEY, CONF_API_KEYS}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    hub = entry_data[ATTR_HUB]
+    sweep = entry_data.get(ATTR_SWEEP)
+
+    return {
+        "entry": async_redact_data(config_entry.as_dict(), TO_REDACT),
+        "schedule": hub.async_get_schedule(),
+        "api_keys": hub.keys.as_diagnostics(
+            coordinator.station_id for coordinator in hub.coordinators.values()
+        ),
+        "price_cache": {
+            "hits": hub.price_cache.hits,
+            "misses": hub.price_cache.misses,
+            "hit_rate": hub.price_cache.hit_rate,
+        },
+        "budget": hub.budget.as_dict() if hub.budget is not None else None,
+        "events": {"fired": hub.events.fired, "pending": hub.events.pending},
+        "metrics": hub.metrics.as_dict() if hub.metrics is not None else None,
+        "sweep": sweep.async_get_status() if sweep is not None else None,
+    }
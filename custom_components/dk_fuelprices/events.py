@@ -0,0 +1,101 @@
+"""Coalesced price change events for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+
+from .const import EVENT_PRICE_CHANGED
+
+if TYPE_CHECKING:
+    from .api import APIClient, StationData
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PriceChangeEvents:
+    """Collect price changes and fire them as a single event.
+
+    Changes of a refresh cycle are held back for the debounce window, so a
+    burst of polls results in one event instead of a state change per sensor.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, config_entry: ConfigEntry, debounce: float
+    ) -> None:
+        """Initialize the price change events."""
+        self._hass = hass
+        self._config_entry = config_entry
+        self._changes: dict[tuple[int, str], dict[str, Any]] = {}
+        self._debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=debounce,
+            immediate=False,
+            function=self._async_fire,
+        )
+        self.fired = 0
+
+    @property
+    def pending(self) -> int:
+        """Return the number of changes waiting to be fired."""
+        return len(self._changes)
+
+    @callback
+    def async_add(self, coordinator: APIClient, previous: StationData | None) -> None:
+        """Record the prices that changed in the latest refresh of a station."""
+        data = coordinator.data
+        if previous is None or data is None or data is previous:
+            # Nothing to compare the first prices of a station with
+            return
+
+        for product, price in data.items():
+            key = (coordinator.station_id, product)
+            if (change := self._changes.get(key)) is None:
+                if price == (old := previous.price(product)):
+                    continue
+                change = self._changes[key] = {
+                    "station_id": coordinator.station_id,
+                    "station_name": data.station_name,
+                    "company": coordinator.company,
+                    "product": product,
+                    "old": old,
+                }
+            change["new"] = price
+            change["updated_at"] = (
+                data.updated_at.isoformat() if data.updated_at else None
+            )
+            if change["new"] == change["old"]:
+                # Changed back within the debounce window
+                del self._changes[key]
+
+    @callback
+    def async_flush(self) -> None:
+        """End a refresh cycle, firing its changes once the window has passed."""
+        if self._changes:
+            self._debouncer.async_schedule_call()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Drop pending changes, for when the config entry is unloaded."""
+        self._debouncer.async_shutdown()
+        self._changes.clear()
+
+    @callback
+    def _async_fire(self) -> None:
+        """Fire the collected changes as one event."""
+        if not self._changes:
+            return
+
+        changes = list(self._changes.values())
+        self._changes.clear()
+        self.fired += 1
+        _LOGGER.debug("Firing %s price change(s)", len(changes))
+        self._hass.bus.async_fire(
+            EVENT_PRICE_CHANGED,
+            {"entry_id": self._config_entry.entry_id, "changes": changes},
+        )
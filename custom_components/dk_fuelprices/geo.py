@@ -0,0 +1,157 @@
+"""Spatial index over the station catalog for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+from collections import defaultdict
+from collections.abc import Iterable
+
+from homeassistant.util.location import distance
+
+from .const import GEO_CELL_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+# Kilometres per degree of latitude
+_KM_PER_DEGREE = 111.32
+
+
+def station_coordinates(station: dict) -> tuple[float, float] | None:
+    """Return the latitude and longitude of a station, if known."""
+    try:
+        return float(station["latitude"]), float(station["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class SpatialIndex:
+    """Grid bucket index answering nearest-station queries across companies."""
+
+    def __init__(self, stations: Iterable[tuple[str, dict]]) -> None:
+        """Build the index from (company, station) pairs."""
+        self._cells: dict[tuple[int, int], list[tuple[float, float, str, dict]]] = (
+            defaultdict(list)
+        )
+        self._size = 0
+        skipped = 0
+        for company, station in stations:
+            if (coordinates := station_coordinates(station)) is None:
+                skipped += 1
+                continue
+            latitude, longitude = coordinates
+            self._cells[self._cell(latitude, longitude)].append(
+                (latitude, longitude, company, station)
+            )
+            self._size += 1
+        if skipped:
+            _LOGGER.warning(
+                "%s of %s station(s) have no coordinates and can't be found nearby",
+                skipped,
+                skipped + self._size,
+            )
+
+        # Bounding box of the occupied cells, beyond which there is nothing to find
+        self._bounds = (
+            min((lat for lat, _ in self._cells), default=0),
+            max((lat for lat, _ in self._cells), default=0),
+            min((lon for _, lon in self._cells), default=0),
+            max((lon for _, lon in self._cells), default=0),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of stations with coordinates."""
+        return self._size
+
+    @staticmethod
+    def _cell(latitude: float, longitude: float) -> tuple[int, int]:
+        """Return the grid cell of a coordinate."""
+        return (
+            math.floor(latitude / GEO_CELL_SIZE),
+            math.floor(longitude / GEO_CELL_SIZE),
+        )
+
+    def _ring(self, center: tuple[int, int], ring: int) -> Iterable[tuple[int, int]]:
+        """Return the cells at exactly ring steps from the center cell."""
+        lat0, lon0 = center
+        if ring == 0:
+            yield center
+            return
+        for offset in range(-ring, ring + 1):
+            yield lat0 - ring, lon0 + offset
+            yield lat0 + ring, lon0 + offset
+        for offset in range(-ring + 1, ring):
+            yield lat0 + offset, lon0 - ring
+            yield lat0 + offset, lon0 + ring
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        count: int,
+        radius: float | None = None,
+    ) -> list[tuple[float, str, dict]]:
+        """Return up to count (km, company, station) tuples, closest first."""
+        if not self._size or count <= 0:
+            return []
+
+        center = self._cell(latitude, longitude)
+        min_lat, max_lat, min_lon, max_lon = self._bounds
+        # Narrowest cell width in km between the query and the stations, bounding
+        # the distance to cells further out
+        widest = max(
+            abs(latitude),
+            abs(min_lat * GEO_CELL_SIZE),
+            abs((max_lat + 1) * GEO_CELL_SIZE),
+        )
+        cell_km = (
+            GEO_CELL_SIZE
+            * _KM_PER_DEGREE
+            * max(math.cos(math.radians(min(widest + GEO_CELL_SIZE, 89))), 0.01)
+        )
+
+        best: list[tuple[float, int, str, dict]] = []
+        # Rings closer than the bounding box are empty, start at its edge
+        ring = max(
+            min_lat - center[0],
+            center[0] - max_lat,
+            min_lon - center[1],
+            center[1] - max_lon,
+            0,
+        )
+        max_ring = max(
+            center[0] - min_lat,
+            max_lat - center[0],
+            center[1] - min_lon,
+            max_lon - center[1],
+        )
+        visited = 0
+        while ring <= max_ring:
+            for cell in self._ring(center, ring):
+                for lat, lon, company, station in self._cells.get(cell, ()):
+                    visited += 1
+                    km = distance(latitude, longitude, lat, lon) / 1000
+                    if radius is not None and km > radius:
+                        continue
+                    item = (-km, id(station), company, station)
+                    if len(best) < count:
+                        heapq.heappush(best, item)
+                    elif km < -best[0][0]:
+                        heapq.heapreplace(best, item)
+
+            # Anything in the next ring is at least ring * cell_km away
+            reach = ring * cell_km
+            if radius is not None and reach > radius:
+                break
+            if len(best) == count and -best[0][0] <= reach:
+                break
+            if visited == self._size:
+                # Every station has been seen, the rings further out are empty
+                break
+            ring += 1
+
+        return [
+            (-km, company, station)
+            for km, _, company, station in sorted(best, reverse=True)
+        ]
@@ -0,0 +1,164 @@
+"""Compact price history with rolling statistics for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from collections.abc import Iterable
+from datetime import timedelta
+
+from .const import HISTORY_CAPACITY
+
+
+class RollingWindow:
+    """Time weighted sum and monotonic min/max queues over a trailing window.
+
+    The sum covers the spans between the samples inside the window. The price
+    of the last sample that left the window is carried, as it was still in
+    effect when the window started.
+    """
+
+    __slots__ = (
+        "carried",
+        "carried_since",
+        "maxs",
+        "mins",
+        "seconds",
+        "start",
+        "total",
+    )
+
+    def __init__(self, seconds: float) -> None:
+        """Initialize the window."""
+        self.seconds = seconds
+        # Logical index of the oldest sample inside the window
+        self.start = 0
+        self.total = 0.0
+        self.carried: float | None = None
+        self.carried_since = 0.0
+        self.mins: deque[int] = deque()
+        self.maxs: deque[int] = deque()
+
+
+class PriceHistory:
+    """Fixed size ring buffer of (timestamp, price) samples of one product."""
+
+    def __init__(
+        self, windows: Iterable[timedelta], capacity: int = HISTORY_CAPACITY
+    ) -> None:
+        """Initialize the history."""
+        self._capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._prices = array("d", bytes(8 * capacity))
+        # Number of samples ever added, so the next logical index
+        self._count = 0
+        self.windows = {
+            window: RollingWindow(window.total_seconds()) for window in windows
+        }
+
+    def __len__(self) -> int:
+        """Return the number of samples kept."""
+        return min(self._count, self._capacity)
+
+    def _time(self, index: int) -> float:
+        return self._times[index % self._capacity]
+
+    def _price(self, index: int) -> float:
+        return self._prices[index % self._capacity]
+
+    def _evict(self, window: RollingWindow, start: int, cutoff: float) -> None:
+        """Drop samples before the start index or older than the cutoff."""
+        while window.start < self._count and (
+            window.start < start or self._time(window.start) < cutoff
+        ):
+            if window.start + 1 < self._count:
+                window.total -= self._price(window.start) * (
+                    self._time(window.start + 1) - self._time(window.start)
+                )
+            window.carried = self._price(window.start)
+            window.carried_since = self._time(window.start)
+            window.start += 1
+        while window.mins and window.mins[0] < window.start:
+            window.mins.popleft()
+        while window.maxs and window.maxs[0] < window.start:
+            window.maxs.popleft()
+
+    def append(self, timestamp: float, price: float) -> bool:
+        """Add a sample, ignoring samples not newer than the last one."""
+        if self._count and timestamp <= self._time(self._count - 1):
+            return False
+
+        index = self._count
+        if index >= self._capacity:
+            # The oldest sample is about to be overwritten, so it leaves every window
+            for window in self.windows.values():
+                self._evict(window, index - self._capacity + 1, float("-inf"))
+
+        for window in self.windows.values():
+            if window.start < index:
+                # The previous price was in effect until now
+                last = self._time(index - 1)
+                window.total += self._price(index - 1) * (timestamp - last)
+
+        slot = index % self._capacity
+        self._times[slot] = timestamp
+        self._prices[slot] = price
+        self._count += 1
+
+        for window in self.windows.values():
+            while window.mins and self._price(window.mins[-1]) >= price:
+                window.mins.pop()
+            window.mins.append(index)
+            while window.maxs and self._price(window.maxs[-1]) <= price:
+                window.maxs.pop()
+            window.maxs.append(index)
+            self._evict(window, 0, timestamp - window.seconds)
+        return True
+
+    def statistics(
+        self, window: timedelta, now: float
+    ) -> tuple[float, float, float] | None:
+        """Return min, max and time weighted mean price of a window ending now.
+
+        The price in effect when the window started counts as well, so a price
+        that didn't change within the window still has statistics. Samples that
+        fall out of the window are dropped, so now must not go back.
+        """
+        rolling = self.windows[window]
+        cutoff = now - rolling.seconds
+        self._evict(rolling, 0, cutoff)
+        prices: list[float] = []
+        weighted = rolling.total
+        begin = end = now
+        if rolling.start < self._count:
+            prices = [self._price(rolling.mins[0]), self._price(rolling.maxs[0])]
+            begin = self._time(rolling.start)
+            end = self._time(self._count - 1)
+            weighted += self._price(self._count - 1) * max(0.0, now - end)
+        if rolling.carried is not None:
+            prices.append(rolling.carried)
+            since = max(rolling.carried_since, cutoff)
+            weighted += rolling.carried * max(0.0, begin - since)
+            begin = min(begin, since)
+        if not prices:
+            return None
+
+        covered = max(now, end) - begin
+        return (
+            min(prices),
+            max(prices),
+            weighted / covered if covered > 0 else self._price(self._count - 1),
+        )
+
+    def as_list(self) -> list[float]:
+        """Return the kept samples as a flat [timestamp, price, ...] list."""
+        samples: list[float] = []
+        for index in range(self._count - len(self), self._count):
+            samples.append(self._time(index))
+            samples.append(self._price(index))
+        return samples
+
+    def extend(self, samples: list[float]) -> None:
+        """Add samples from a flat [timestamp, price, ...] list."""
+        for offset in range(0, len(samples) - 1, 2):
+            self.append(samples[offset], samples[offset + 1])
@@ -0,0 +1,392 @@
+"""Central fetch hub for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+import zlib
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, TypeVar
+
+from aiohttp import ClientResponseError
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .api import PriceCache
+from .budget import RequestBudget
+from .cadence import PriceCadence
+from .const import (
+    CONF_DAILY_BUDGET,
+    CONF_EVENT_DEBOUNCE,
+    CONF_HISTORY_WINDOWS,
+    CONF_METRICS,
+    CONF_QUIET_END,
+    CONF_QUIET_START,
+    CONF_REQUESTS_PER_MINUTE,
+    CONF_STATISTICS,
+    DEFAULT_DAILY_BUDGET,
+    DEFAULT_EVENT_DEBOUNCE,
+    DEFAULT_HISTORY_WINDOWS,
+    DEFAULT_PRIORITY,
+    MIN_SCAN_INTERVAL,
+    PHASE_SPREAD,
+    POLL_JITTER,
+    SCAN_INTERVAL,
+    STATION_PRIORITIES,
+    TICK_INTERVAL,
+)
+from .events import PriceChangeEvents
+from .keypool import KeyPool, PooledKey
+from .metrics import ApiMetrics
+from .store import SnapshotStore
+
+if TYPE_CHECKING:
+    from pybraendstofpriser import Braendstofpriser
+
+    from .api import APIClient, StationData
+    from .ratelimit import RequestScheduler
+    from .statistics import PriceStatistics
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class BraendstofpriserHub:
+    """Own the API client and schedule station fetches for a config entry."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        api_keys: list[str],
+        store: SnapshotStore,
+    ) -> None:
+        """Initialize the hub."""
+        self._hass = hass
+        self.config_entry = config_entry
+        self.store = store
+        self.keys = KeyPool(
+            hass, api_keys, config_entry.options.get(CONF_REQUESTS_PER_MINUTE)
+        )
+        self.price_cache = PriceCache(async_get_clientsession(hass))
+        self.coordinators: dict[str, APIClient] = {}
+        self._next_refresh: dict[str, datetime] = {}
+        self._refreshing: set[str] = set()
+        # Station data last written to the snapshot store
+        self._stored: dict[str, StationData | None] = {}
+        self.cadences: dict[str, PriceCadence] = {}
+        self.company_cadences: dict[str, PriceCadence] = {}
+        self.statistics: PriceStatistics | None = None
+        if config_entry.options.get(CONF_STATISTICS, False):
+            # Importing the recorder is costly, so only do it when statistics are on
+            from .statistics import PriceStatistics
+
+            self.statistics = PriceStatistics(hass)
+        self.metrics = (
+            ApiMetrics() if config_entry.options.get(CONF_METRICS, False) else None
+        )
+        self.price_cache.metrics = self.metrics
+        for key in self.keys.keys:
+            key.scheduler.metrics = self.metrics
+        self.budget: RequestBudget | None = None
+        if daily_budget := config_entry.options.get(
+            CONF_DAILY_BUDGET, DEFAULT_DAILY_BUDGET
+        ):
+            quiet_start = config_entry.options.get(CONF_QUIET_START)
+            quiet_end = config_entry.options.get(CONF_QUIET_END)
+            self.budget = RequestBudget(
+                self.keys,
+                store,
+                daily_budget,
+                (
+                    (dt_util.parse_time(quiet_start), dt_util.parse_time(quiet_end))
+                    if quiet_start and quiet_end
+                    else None
+                ),
+            )
+        self._total_weight = 0
+        self.events = PriceChangeEvents(
+            hass,
+            config_entry,
+            config_entry.options.get(CONF_EVENT_DEBOUNCE, DEFAULT_EVENT_DEBOUNCE),
+        )
+        self.history_windows = [
+            timedelta(days=int(days))
+            for days in config_entry.options.get(
+                CONF_HISTORY_WINDOWS, DEFAULT_HISTORY_WINDOWS
+            )
+        ]
+
+    @property
+    def api(self) -> Braendstofpriser:
+        """Return the API client for requests not tied to a station."""
+        return self.keys.primary.client
+
+    @property
+    def scheduler(self) -> RequestScheduler:
+        """Return the request scheduler of the API client."""
+        return self.keys.primary.scheduler
+
+    @callback
+    def async_add_coordinator(self, coordinator: APIClient) -> None:
+        """Register a station coordinator with the hub."""
+        self.coordinators[coordinator.subentry_id] = coordinator
+        self._total_weight += self.weight(coordinator)
+        self.cadences.setdefault(coordinator.subentry_id, PriceCadence())
+        self.company_cadences.setdefault(coordinator.company, PriceCadence())
+        self._next_refresh[coordinator.subentry_id] = self._async_next_refresh(
+            coordinator.subentry_id, dt_util.utcnow(), None
+        )
+        # Restored data is stored already
+        self._stored[coordinator.subentry_id] = coordinator.data
+
+    @callback
+    def async_remove_coordinator(
+        self, subentry_id: str, keep_data: bool = False
+    ) -> None:
+        """Unregister a station coordinator from the hub.
+
+        With keep_data, the stored data and learned cadence of the station are
+        kept for the coordinator that replaces it.
+        """
+        if (coordinator := self.coordinators.pop(subentry_id, None)) is not None:
+            self._total_weight -= self.weight(coordinator)
+            if self.statistics is not None:
+                self.statistics.async_remove(coordinator)
+            if not keep_data:
+                self.price_cache.invalidate(coordinator.station_id)
+        if not keep_data:
+            self.store.async_delete(subentry_id)
+            self.cadences.pop(subentry_id, None)
+        self._next_refresh.pop(subentry_id, None)
+        self._stored.pop(subentry_id, None)
+
+    @callback
+    def async_close(self) -> None:
+        """Stop sending requests, for when the config entry is unloaded."""
+        # Requests still queued by the scheduler fail instead of going out late
+        self.keys.close()
+        self.price_cache.close()
+        self.events.async_shutdown()
+
+    async def async_flush(self) -> None:
+        """Write pending state to disk, for when the config entry is unloaded."""
+        if self.budget is not None:
+            self.budget.async_save()
+        await self.store.async_flush()
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start the shared refresh schedule and return a stop callback."""
+        return async_track_time_interval(
+            self._hass,
+            self._async_tick,
+            TICK_INTERVAL,
+            name=f"{self.config_entry.title} refresh",
+            cancel_on_shutdown=True,
+        )
+
+    @callback
+    def async_schedule_refresh(self, coordinator: APIClient) -> None:
+        """Learn from the latest refresh and schedule the next one."""
+        subentry_id = coordinator.subentry_id
+        if self.coordinators.get(subentry_id) is not coordinator:
+            # Removed, or replaced by a reconfigured station, while refreshing
+            return
+
+        now = dt_util.utcnow()
+        cadence = self.cadences[subentry_id]
+        company_cadence = self.company_cadences[coordinator.company]
+        delay: timedelta | None = None
+        if coordinator.last_update_success:
+            if (interval := cadence.observe(coordinator.updated_at)) is not None:
+                company_cadence.add_interval(interval)
+            delay = cadence.next_delay(now, company_cadence.interval)
+            data = coordinator.data
+            if data is not None and data is not self._stored.get(subentry_id):
+                # Only new station data, and so new history samples, is stored
+                self._stored[subentry_id] = data
+                self.store.async_set(subentry_id, data.as_dict())
+                self.store.async_set_history(subentry_id, coordinator.as_history())
+            if self.statistics is not None:
+                self.statistics.async_record(coordinator)
+
+        self._next_refresh[subentry_id] = self._async_next_refresh(
+            subentry_id, now, delay
+        )
+        _LOGGER.debug(
+            "Next refresh of station %s at %s",
+            coordinator.station_name,
+            self._next_refresh[subentry_id],
+        )
+
+    @staticmethod
+    def weight(coordinator: APIClient) -> int:
+        """Return the share of the request budget a station gets."""
+        return STATION_PRIORITIES.get(
+            coordinator.priority, STATION_PRIORITIES[DEFAULT_PRIORITY]
+        )
+
+    @callback
+    def async_sweep_allowed(self, requests: int) -> bool:
+        """Return if a sweep batch leaves enough of the budget for the stations."""
+        if self.budget is None:
+            return True
+
+        now = dt_util.utcnow()
+        active = self.budget.active_seconds(now)
+        # The requests the stations need at their own cadence for the rest of today
+        reserved = sum(
+            active
+            / max(
+                self.cadences[subentry_id].interval
+                or self.company_cadences[coordinator.company].interval
+                or SCAN_INTERVAL,
+                MIN_SCAN_INTERVAL,
+            ).total_seconds()
+            for subentry_id, coordinator in self.coordinators.items()
+        )
+        return self.budget.allows(requests, reserved, now)
+
+    @staticmethod
+    def phase(subentry_id: str) -> float:
+        """Return the deterministic phase of a station as a fraction of one."""
+        return zlib.crc32(subentry_id.encode()) / 2**32
+
+    @callback
+    def _async_next_refresh(
+        self, subentry_id: str, now: datetime, delay: timedelta | None
+    ) -> datetime:
+        """Return the next refresh time, spread out by the station's phase."""
+        jitter = timedelta(seconds=random.uniform(0, POLL_JITTER.total_seconds()))
+        phase = self.phase(subentry_id)
+
+        if delay is not None:
+            # Stations of one company tend to change together, so spread them a bit
+            next_refresh = now + delay + PHASE_SPREAD * phase + jitter
+        else:
+            # Without a known cadence, poll at a fixed offset within every interval
+            interval = SCAN_INTERVAL.total_seconds()
+            target = now.timestamp() + interval
+            slot = target - (target - phase * interval) % interval
+            if slot < now.timestamp() + MIN_SCAN_INTERVAL.total_seconds():
+                slot += interval
+            next_refresh = dt_util.utc_from_timestamp(slot) + jitter
+
+        if self.budget is not None:
+            next_refresh = self.budget.async_plan(
+                next_refresh,
+                now,
+                self.weight(self.coordinators[subentry_id]),
+                self._total_weight,
+                PHASE_SPREAD * phase + jitter,
+            )
+        return next_refresh
+
+    @callback
+    def async_get_schedule(self) -> dict[str, dict]:
+        """Return the current refresh schedule of every station."""
+        now = dt_util.utcnow()
+        schedule = {}
+        for subentry_id, coordinator in self.coordinators.items():
+            cadence = self.cadences[subentry_id]
+            company_cadence = self.company_cadences[coordinator.company]
+            budget_interval = (
+                self.budget.interval(self.weight(coordinator), self._total_weight, now)
+                if self.budget is not None
+                else None
+            )
+            schedule[subentry_id] = {
+                "station_id": coordinator.station_id,
+                "station_name": coordinator.station_name,
+                "company": coordinator.company,
+                "phase": round(self.phase(subentry_id), 4),
+                "next_refresh": self._next_refresh[subentry_id].isoformat(),
+                "refreshing": subentry_id in self._refreshing,
+                "last_update_success": coordinator.last_update_success,
+                "last_change": (
+                    cadence.last_change.isoformat() if cadence.last_change else None
+                ),
+                "cadence": str(cadence.interval) if cadence.interval else None,
+                "company_cadence": (
+                    str(company_cadence.interval) if company_cadence.interval else None
+                ),
+                "quiet_polls": cadence.quiet_polls,
+                "priority": coordinator.priority,
+                "budget_interval": str(budget_interval) if budget_interval else None,
+                "skipped_writes": coordinator.skipped_writes,
+            }
+        return schedule
+
+    async def async_get_prices(self, station_id: int) -> dict:
+        """Fetch prices for a single station."""
+        while True:
+            key = self.keys.key_for(station_id)
+            try:
+                return await key.scheduler.async_run(
+                    self.price_cache.async_get_prices, station_id, key.api_key
+                )
+            except ClientResponseError as exc:
+                # Retry with another key, until no key is left and reauth is needed
+                if exc.status != 401 or not self.keys.async_disable(key):
+                    raise
+
+    async def async_run_with_key(
+        self, func: Callable[[PooledKey], Awaitable[_T]]
+    ) -> _T:
+        """Run requests not tied to a station, such as catalog lookups."""
+        while True:
+            key = self.keys.primary
+            try:
+                return await func(key)
+            except ClientResponseError as exc:
+                # Retry with another key, until no key is left and reauth is needed
+                if exc.status != 401 or not self.keys.async_disable(key):
+                    raise
+
+    async def async_refresh_stations(self, coordinators: list[APIClient]) -> None:
+        """Refresh the given stations now."""
+        await asyncio.gather(*(self._async_refresh(c) for c in coordinators))
+        # One event for every price changed in this cycle
+        self.events.async_flush()
+
+    async def _async_tick(self, now: datetime) -> None:
+        """Refresh every station whose next refresh is due."""
+        if self.statistics is not None:
+            self.statistics.async_flush(now)
+
+        due = [
+            coordinator
+            for subentry_id, coordinator in self.coordinators.items()
+            if self._next_refresh[subentry_id] <= now
+            and subentry_id not in self._refreshing
+        ]
+        if not due:
+            return
+
+        _LOGGER.debug("Refreshing %s station(s)", len(due))
+        await self.async_refresh_stations(due)
+
+    async def _async_refresh(self, coordinator: APIClient) -> None:
+        """Refresh a single station coordinator and reschedule it."""
+        subentry_id = coordinator.subentry_id
+        self._refreshing.add(subentry_id)
+        previous = coordinator.data
+        started = time.monotonic()
+        try:
+            await coordinator.async_refresh()
+            self.events.async_add(coordinator, previous)
+        finally:
+            self._refreshing.discard(subentry_id)
+            if self.metrics is not None:
+                self.metrics.record_refresh(
+                    time.monotonic() - started, coordinator.last_update_success
+                )
+            self.async_schedule_refresh(coordinator)
@@ -0,0 +1,122 @@
+"""API key pooling for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+import logging
+import zlib
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+
+from .client import async_create_client
+from .ratelimit import RequestScheduler, async_get_scheduler
+
+if TYPE_CHECKING:
+    from pybraendstofpriser import Braendstofpriser
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def redact_key(api_key: str) -> str:
+    """Return an API key reduced to its last characters, for logs and diagnostics."""
+    if len(api_key) < 16:
+        # Too short to reveal any part of it
+        return "**REDACTED**"
+    return f"...{api_key[-4:]}"
+
+
+@dataclass(slots=True)
+class PooledKey:
+    """An API key with its own client and request scheduler."""
+
+    api_key: str
+    client: Braendstofpriser
+    scheduler: RequestScheduler
+    healthy: bool = True
+
+
+class KeyPool:
+    """Spread station fetches across several API keys.
+
+    Stations are assigned to keys by rendezvous hashing, so taking a key out of
+    rotation only moves the stations that were assigned to it.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_keys: Iterable[str],
+        requests_per_minute: float | None = None,
+    ) -> None:
+        """Initialize the key pool."""
+        self.keys = [
+            PooledKey(
+                api_key,
+                async_create_client(hass, api_key),
+                # Every key has its own request budget
+                async_get_scheduler(hass, api_key, requests_per_minute),
+            )
+            for api_key in dict.fromkeys(api_keys)
+        ]
+
+    def __len__(self) -> int:
+        """Return the number of keys in the pool."""
+        return len(self.keys)
+
+    @property
+    def healthy(self) -> list[PooledKey]:
+        """Return the keys still in rotation."""
+        return [key for key in self.keys if key.healthy]
+
+    @property
+    def primary(self) -> PooledKey:
+        """Return the key used for requests not tied to a station."""
+        return next((key for key in self.keys if key.healthy), self.keys[0])
+
+    def key_for(self, station_id: int) -> PooledKey:
+        """Return the key a station is fetched with."""
+        # Without healthy keys, keep trying them all until reauth replaces them
+        keys = self.healthy or self.keys
+        if len(keys) == 1:
+            return keys[0]
+        return max(
+            keys, key=lambda key: zlib.crc32(f"{key.api_key}:{station_id}".encode())
+        )
+
+    @callback
+    def async_disable(self, key: PooledKey) -> bool:
+        """Take a rejected key out of rotation and return if any key is left."""
+        if key.healthy:
+            key.healthy = False
+            _LOGGER.warning(
+                "API key %s was rejected, %s of %s key(s) left in rotation",
+                redact_key(key.api_key),
+                len(self.healthy),
+                len(self.keys),
+            )
+        return bool(self.healthy)
+
+    def close(self) -> None:
+        """Refuse further requests with every key."""
+        for key in self.keys:
+            key.client.conn.close()
+
+    def as_diagnostics(self, station_ids: Iterable[int]) -> list[dict]:
+        """Return the state and load of every key."""
+        stations = dict.fromkeys((key.api_key for key in self.keys), 0)
+        for station_id in station_ids:
+            stations[self.key_for(station_id).api_key] += 1
+        return [
+            {
+                "key": redact_key(key.api_key),
+                "healthy": key.healthy,
+                "stations": stations[key.api_key],
+                "requests": key.scheduler.requests,
+                "rate_limited": key.scheduler.rate_limited,
+                "queued": key.scheduler.queued,
+                "requests_per_minute": key.scheduler.requests_per_minute,
+            }
+            for key in self.keys
+        ]
@@ -0,0 +1,145 @@
+"""Request and refresh metrics for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+
+from .const import METRICS_LATENCY_BUCKETS
+
+
+class Histogram:
+    """Fixed bucket histogram with count, sum, min and max."""
+
+    __slots__ = ("bounds", "buckets", "count", "maximum", "minimum", "total")
+
+    def __init__(self, bounds: tuple[float, ...] = METRICS_LATENCY_BUCKETS) -> None:
+        """Initialize the histogram."""
+        self.bounds = bounds
+        # The last bucket holds everything above the highest bound
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+
+    def add(self, value: float) -> None:
+        """Add an observation."""
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def quantile(self, q: float) -> float | None:
+        """Return the upper bound of the bucket holding the given quantile."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.maximum)
+        return self.maximum
+
+    def as_dict(self) -> dict:
+        """Return the histogram as diagnostics data."""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4),
+            "min": round(self.minimum, 4),
+            "max": round(self.maximum, 4),
+            "p50": round(self.quantile(0.5), 4),
+            "p95": round(self.quantile(0.95), 4),
+            "p99": round(self.quantile(0.99), 4),
+            "buckets": {
+                f"le_{bound}": count
+                for bound, count in zip(self.bounds, self.buckets)
+                if count
+            }
+            | ({"inf": self.buckets[-1]} if self.buckets[-1] else {}),
+        }
+
+
+class ApiMetrics:
+    """Counters and latency histograms of API calls and station refreshes."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.calls: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        # Failed calls by HTTP status, or by exception name without a response
+        self.failures: Counter[int | str] = Counter()
+        self.latency: dict[str, Histogram] = {}
+        self.all_latency = Histogram()
+        self.refresh = Histogram()
+        self.failed_refreshes = 0
+        self.payload_bytes = 0
+        self.payloads = 0
+        self.largest_payload = 0
+
+    def record_call(
+        self, name: str, seconds: float, failure: int | str | None = None
+    ) -> None:
+        """Record a finished API call and why it failed, if it did."""
+        self.calls[name] += 1
+        if (histogram := self.latency.get(name)) is None:
+            histogram = self.latency[name] = Histogram()
+        histogram.add(seconds)
+        self.all_latency.add(seconds)
+        if failure is not None:
+            self.errors[name] += 1
+            self.failures[failure] += 1
+
+    def record_payload(self, size: int) -> None:
+        """Record the size of a response body."""
+        self.payloads += 1
+        self.payload_bytes += size
+        self.largest_payload = max(self.largest_payload, size)
+
+    def record_refresh(self, seconds: float, success: bool) -> None:
+        """Record a station refresh."""
+        self.refresh.add(seconds)
+        if not success:
+            self.failed_refreshes += 1
+
+    @property
+    def requests(self) -> int:
+        """Return the number of API calls made."""
+        return self.calls.total()
+
+    @property
+    def failed_requests(self) -> int:
+        """Return the number of API calls that failed."""
+        return self.errors.total()
+
+    @property
+    def rate_limited(self) -> int:
+        """Return the number of API calls rejected with 429."""
+        return self.failures[429]
+
+    def as_dict(self) -> dict:
+        """Return the metrics as diagnostics data."""
+        return {
+            "requests": dict(self.calls),
+            "errors": dict(self.errors),
+            "failures": {str(key): count for key, count in self.failures.items()},
+            "latency": {
+                name: histogram.as_dict() for name, histogram in self.latency.items()
+            },
+            "refresh": {
+                "failed": self.failed_refreshes,
+                "latency": self.refresh.as_dict(),
+            },
+            "payload": {
+                "count": self.payloads,
+                "bytes": self.payload_bytes,
+                "largest": self.largest_payload,
+                "mean": (
+                    round(self.payload_bytes / self.payloads) if self.payloads else None
+                ),
+            },
+        }
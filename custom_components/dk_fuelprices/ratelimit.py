@@ -0,0 +1,191 @@
+"""Request scheduling and rate limiting for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from aiohttp import ClientError, ClientResponseError
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    API_BACKOFF_BASE,
+    API_BACKOFF_MAX,
+    API_BURST,
+    API_MAX_RETRIES,
+    DATA_SCHEDULERS,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DOMAIN,
+)
+
+if TYPE_CHECKING:
+    from .metrics import ApiMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header into a number of seconds."""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, (retry_at - dt_util.utcnow()).total_seconds())
+
+
+class RequestScheduler:
+    """Token bucket scheduler shared by every request made with one API key."""
+
+    def __init__(self, requests_per_minute: float, burst: int = API_BURST) -> None:
+        """Initialize the scheduler."""
+        self._rate = requests_per_minute / 60
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self._queued = 0
+        # Per key accounting, shared by every entry and flow using the key
+        self.requests = 0
+        self.rate_limited = 0
+        # Set by the hub when metrics are enabled
+        self.metrics: ApiMetrics | None = None
+
+    @property
+    def requests_per_minute(self) -> float:
+        """Return the sustained request rate."""
+        return self._rate * 60
+
+    @requests_per_minute.setter
+    def requests_per_minute(self, value: float) -> None:
+        """Change the sustained request rate."""
+        self._refill()
+        self._rate = value / 60
+
+    @property
+    def queued(self) -> int:
+        """Return the number of requests waiting for a token."""
+        return self._queued
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    async def _async_acquire(self) -> None:
+        """Wait until a request may be sent."""
+        # The lock hands out tokens in FIFO order so requests are queued, not dropped
+        self._queued += 1
+        try:
+            async with self._lock:
+                while True:
+                    self._refill()
+                    wait = max(
+                        self._blocked_until - time.monotonic(),
+                        (1 - self._tokens) / self._rate if self._tokens < 1 else 0,
+                    )
+                    if wait <= 0:
+                        self._tokens -= 1
+                        return
+                    await asyncio.sleep(wait)
+        finally:
+            self._queued -= 1
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        """Return the delay before the next attempt."""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, 1)
+        return random.uniform(0, min(API_BACKOFF_MAX, API_BACKOFF_BASE * 2**attempt))
+
+    async def async_run(
+        self, func: Callable[..., Awaitable[_T]], *args: Any, **kwargs: Any
+    ) -> _T:
+        """Run an API call once the rate limit allows it, retrying on 429."""
+        attempt = 0
+        while True:
+            await self._async_acquire()
+            self.requests += 1
+            started = time.monotonic()
+            try:
+                result = await func(*args, **kwargs)
+            except ClientResponseError as exc:
+                self._record(func, started, exc.status)
+                if exc.status != 429:
+                    raise
+                self.rate_limited += 1
+                if attempt >= API_MAX_RETRIES:
+                    raise
+
+                retry_after = parse_retry_after(
+                    exc.headers.get("Retry-After") if exc.headers else None
+                )
+                delay = self._backoff(attempt, retry_after)
+                attempt += 1
+
+                # Hold back every queued request, not just this one
+                self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+                self._tokens = 0
+                _LOGGER.debug(
+                    "Rate limited by API, retrying %s in %.1f seconds (attempt %s/%s)",
+                    getattr(func, "__name__", func),
+                    delay,
+                    attempt,
+                    API_MAX_RETRIES,
+                )
+            except (ClientError, TimeoutError) as exc:
+                self._record(func, started, type(exc).__name__)
+                raise
+            else:
+                self._record(func, started)
+                return result
+
+    def _record(
+        self, func: Callable, started: float, failure: int | str | None = None
+    ) -> None:
+        """Record an API call with the metrics, if enabled."""
+        if self.metrics is not None:
+            self.metrics.record_call(
+                getattr(func, "__name__", "call").removeprefix("async_"),
+                time.monotonic() - started,
+                failure,
+            )
+
+
+def async_get_scheduler(
+    hass: HomeAssistant,
+    api_key: str,
+    requests_per_minute: float | None = None,
+) -> RequestScheduler:
+    """Return the shared request scheduler for an API key."""
+    schedulers: dict[str, RequestScheduler] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(DATA_SCHEDULERS, {})
+
+    if (scheduler := schedulers.get(api_key)) is None:
+        scheduler = schedulers[api_key] = RequestScheduler(
+            requests_per_minute or DEFAULT_REQUESTS_PER_MINUTE
+        )
+    elif requests_per_minute is not None:
+        scheduler.requests_per_minute = requests_per_minute
+
+    return scheduler
@@ -2,21 +2,43 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
 from homeassistant.components.sensor import (
     RestoreSensor,
     SensorDeviceClass,
+    SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.core import callback
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import slugify as util_slugify
 
 from .api import APIClient
-from .const import ATTR_COORDINATOR, DOMAIN
+from .const import (
+    ATTR_COORDINATOR,
+    ATTR_ENTITIES,
+    ATTR_HUB,
+    ATTR_SWEEP,
+    DOMAIN,
+    HISTORY_WINDOWS,
+    METRICS_SCAN_INTERVAL,
+    SIGNAL_ADD_SUBENTRY,
+    WEBSITE_URL,
+)
+from .hub import BraendstofpriserHub
+from .sweep import PriceSweep
+
+# Only the metric sensors are polled, every other sensor follows a coordinator
+SCAN_INTERVAL = METRICS_SCAN_INTERVAL
 
 SENSORS = [
     SensorEntityDescription(
@@ -35,39 +57,138 @@ SENSORS = [
     ),
 ]
 
+CHEAPEST_SENSOR = SensorEntityDescription(
+    key="cheapest",
+    native_unit_of_measurement="DKK/L",
+    device_class=SensorDeviceClass.MONETARY,
+    state_class=SensorStateClass.TOTAL,
+    icon="mdi:gas-station",
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class MetricSensorEntityDescription(SensorEntityDescription):
+    """Describe a diagnostic sensor showing an API metric."""
+
+    value_fn: Callable[[BraendstofpriserHub], float | int | None]
+
+
+def _latency_p95(hub: BraendstofpriserHub) -> float | None:
+    """Return the 95th percentile API latency in milliseconds."""
+    if (p95 := hub.metrics.all_latency.quantile(0.95)) is None:
+        return None
+    return round(p95 * 1000)
+
+
+METRIC_SENSORS = [
+    MetricSensorEntityDescription(
+        key="requests",
+        name="API requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:api",
+        value_fn=lambda hub: hub.metrics.requests,
+    ),
+    MetricSensorEntityDescription(
+        key="failed_requests",
+        name="Failed API requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:api-off",
+        value_fn=lambda hub: hub.metrics.failed_requests,
+    ),
+    MetricSensorEntityDescription(
+        key="rate_limited",
+        name="Rate limited API requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:speedometer-slow",
+        value_fn=lambda hub: hub.metrics.rate_limited,
+    ),
+    MetricSensorEntityDescription(
+        key="latency_p95",
+        name="API latency (95th percentile)",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_latency_p95,
+    ),
+    MetricSensorEntityDescription(
+        key="cache_hit_rate",
+        name="Unchanged price responses",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:cached",
+        value_fn=lambda hub: (
+            round(hub.price_cache.hit_rate * 100, 1)
+            if hub.price_cache.hit_rate is not None
+            else None
+        ),
+    ),
+]
+
+BUDGET_SENSOR = MetricSensorEntityDescription(
+    key="budget_remaining",
+    name="Remaining API requests today",
+    state_class=SensorStateClass.MEASUREMENT,
+    icon="mdi:counter",
+    value_fn=lambda hub: hub.budget.remaining(),
+)
+
 
 async def async_setup_entry(hass, entry, async_add_devices):
     """Set up sensor platform for Braendstofpriser integration."""
 
     subentries = hass.data[DOMAIN][entry.entry_id]["subentries"]
 
-    sensors = []
-    for subentry_data in subentries.values():
-        coordinator = subentry_data[ATTR_COORDINATOR]
-        expected_unique_ids = {
-            util_slugify(
-                f"{coordinator.subentry_id}_last_updated_last_updated"
-            )
-        }
-        for product_key in coordinator.products:
-            expected_unique_ids.add(
-                util_slugify(
-                    f"{coordinator.subentry_id}_price_{product_key}"
-                )
+    hub: BraendstofpriserHub = hass.data[DOMAIN][entry.entry_id][ATTR_HUB]
+    sweep: PriceSweep | None = hass.data[DOMAIN][entry.entry_id].get(ATTR_SWEEP)
+    metric_sensors = []
+    if hub.metrics is not None:
+        metric_sensors.extend(
+            ApiMetricSensor(hub, description) for description in METRIC_SENSORS
+        )
+    if hub.budget is not None:
+        metric_sensors.append(ApiMetricSensor(hub, BUDGET_SENSOR))
+
+    metric_ids = {sensor.unique_id for sensor in metric_sensors}
+    cheapest_prefix = f"{util_slugify(f'{entry.entry_id}_cheapest')}_"
+
+    def _is_provided(unique_id: str) -> bool:
+        """Return if an entity of the entry itself is still provided."""
+        if sweep is not None and unique_id.startswith(cheapest_prefix):
+            # Products are only known once swept, so keep every cheapest sensor
+            return True
+        return unique_id in metric_ids
+
+    async_prune_registry(
+        hass,
+        entry,
+        [data[ATTR_COORDINATOR] for data in subentries.values()],
+        _is_provided,
+    )
+    if metric_sensors:
+        async_add_devices(metric_sensors)
+
+    if sweep is not None:
+        cheapest_products: set[str] = set()
+
+        @callback
+        def _async_add_cheapest_sensors() -> None:
+            """Add a cheapest price sensor for every newly swept product."""
+            new_products = set(sweep.data or {}) - cheapest_products
+            if not new_products:
+                return
+            cheapest_products.update(new_products)
+            async_add_devices(
+                [CheapestPriceSensor(sweep, product) for product in new_products]
             )
 
-        ent_reg = er.async_get(hass)
-        for entity in er.async_entries_for_config_entry(ent_reg, entry.entry_id):
-            if entity.config_subentry_id != coordinator.subentry_id:
-                continue
-            if entity.unique_id and entity.unique_id not in expected_unique_ids:
-                ent_reg.async_remove(entity.entity_id)
-        dev_reg = dr.async_get(hass)
-        for device in dr.async_entries_for_config_entry(dev_reg, entry.entry_id):
-            if (DOMAIN, coordinator.subentry_id) not in device.identifiers:
-                continue
-            if not er.async_entries_for_device(ent_reg, device.id):
-                dev_reg.async_remove_device(device.id)
+        _async_add_cheapest_sensors()
+        entry.async_on_unload(sweep.async_add_listener(_async_add_cheapest_sensors))
+
+    @callback
+    def _async_add_subentry(subentry_id: str) -> None:
+        """Add the sensors of a station subentry."""
+        subentry_data = subentries[subentry_id]
+        coordinator = subentry_data[ATTR_COORDINATOR]
 
         subentry_sensors = []
         for sensor in SENSORS:
@@ -81,27 +202,97 @@ async def async_setup_entry(hass, entry, async_add_devices):
                     )
                 )
             else:
-                for product_key, product_info in coordinator.products.items():
+                for product_key in coordinator.products:
                     subentry_sensors.append(
                         BraendstofpriserSensor(
                             coordinator,
                             product_key,
-                            product_info["name"],
+                            product_key,
                             sensor,
                         )
                     )
 
+        subentry_data[ATTR_ENTITIES] = subentry_sensors
+
+        # Coordinators are refreshed by the hub, so don't request another update here
         async_add_devices(
             subentry_sensors,
-            True,
+            False,
             config_subentry_id=coordinator.subentry_id,
         )
 
+    for subentry_id in subentries:
+        _async_add_subentry(subentry_id)
+
+    @callback
+    def _async_add_new_subentry(subentry_id: str) -> None:
+        """Add the sensors of a subentry added or changed after setup."""
+        async_prune_registry(hass, entry, [subentries[subentry_id][ATTR_COORDINATOR]])
+        _async_add_subentry(subentry_id)
+
+    # Subentries added or changed later are set up without reloading the entry
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_ADD_SUBENTRY.format(entry.entry_id), _async_add_new_subentry
+        )
+    )
+
+
+@callback
+def async_prune_registry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinators: Iterable[APIClient],
+    is_provided: Callable[[str], bool] | None = None,
+) -> None:
+    """Remove stale entities and devices of the given stations in a single pass.
+
+    With is_provided, entities of the entry itself, such as the API metrics,
+    are pruned as well when it returns False for their unique ID, and so is
+    every device left without entities.
+    """
+    expected: dict[str, set[str]] = {}
+    for coordinator in coordinators:
+        unique_ids = expected[coordinator.subentry_id] = {
+            util_slugify(f"{coordinator.subentry_id}_last_updated_last_updated")
+        }
+        for product_key in coordinator.products:
+            unique_ids.add(
+                util_slugify(f"{coordinator.subentry_id}_price_{product_key}")
+            )
+
+    ent_reg = er.async_get(hass)
+    devices_in_use: set[str] = set()
+    for entity in er.async_entries_for_config_entry(ent_reg, entry.entry_id):
+        if entity.config_subentry_id is None:
+            stale = is_provided is not None and not is_provided(entity.unique_id)
+        else:
+            unique_ids = expected.get(entity.config_subentry_id)
+            stale = unique_ids is not None and entity.unique_id not in unique_ids
+        if stale:
+            ent_reg.async_remove(entity.entity_id)
+        elif entity.device_id is not None:
+            devices_in_use.add(entity.device_id)
+
+    dev_reg = dr.async_get(hass)
+    for device in dr.async_entries_for_config_entry(dev_reg, entry.entry_id):
+        if device.id in devices_in_use:
+            continue
+        if is_provided is not None or any(
+            domain == DOMAIN and identifier in expected
+            for domain, identifier in device.identifiers
+        ):
+            dev_reg.async_remove_device(device.id)
+
 
 class BraendstofpriserSensor(CoordinatorEntity[APIClient], RestoreSensor):
     """Sensor for Braendstofpriser integration."""
 
     _attr_has_entity_name = True
+    # Rolling statistics are derived from the state, so keep them out of the recorder
+    _unrecorded_attributes = frozenset(
+        f"{stat}_{days}d" for stat in ("min", "max", "mean") for days in HISTORY_WINDOWS
+    )
 
     def __init__(self, coordinator, product_key, product_name, description):
         """Initialize the sensor."""
@@ -115,6 +306,9 @@ class BraendstofpriserSensor(CoordinatorEntity[APIClient], RestoreSensor):
             self._attr_name = "Last Updated"
         else:
             self._attr_name = f"{product_name}"
+            if coordinator.hub.statistics is not None:
+                # Hourly statistics are imported directly, don't compile them twice
+                self._attr_state_class = None
 
         self._attr_unique_id = util_slugify(
             f"{self.coordinator.subentry_id}_{self.entity_description.key}_{product_key}"
@@ -134,20 +328,120 @@ class BraendstofpriserSensor(CoordinatorEntity[APIClient], RestoreSensor):
         )
 
         self._attr_native_value = self.get_value()
+        self._last_available = self.available
+        self._attr_extra_state_attributes = self.get_statistics()
 
     def get_value(self):
         """Get the current value of the sensor."""
+        if (data := self.coordinator.data) is None:
+            return None
         if self.entity_description.key == "last_updated":
-            return self.coordinator.updated_at
+            return data.updated_at
 
-        return self.coordinator.products[self._product_key]["price"]
+        return data.price(self._product_key)
+
+    def get_statistics(self) -> dict | None:
+        """Get the rolling price statistics of the sensor."""
+        if self.entity_description.key == "last_updated":
+            return None
+
+        return self.coordinator.statistics(self._product_key)
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         value = self.get_value()
+        available = self.available
+        attributes = self.get_statistics()
+
+        if (
+            (value is None or value == self._attr_native_value)
+            and available == self._last_available
+            and attributes == self._attr_extra_state_attributes
+        ):
+            # Nothing this entity shows has changed, skip the state write
+            self.coordinator.skipped_writes += 1
+            return
 
         if value is not None:
-            self._attr_native_value = self.get_value()
+            self._attr_native_value = value
+        self._last_available = available
+        self._attr_extra_state_attributes = attributes
+
+        self.async_write_ha_state()
+
+
+class CheapestPriceSensor(CoordinatorEntity[PriceSweep], SensorEntity):
+    """Cheapest price of a product around the home zone."""
+
+    _attr_has_entity_name = True
+    entity_description = CHEAPEST_SENSOR
+
+    def __init__(self, coordinator: PriceSweep, product_key: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._product_key = product_key
+        self._attr_name = f"Cheapest {product_key}"
+        self._attr_unique_id = util_slugify(
+            f"{coordinator.config_entry.entry_id}_cheapest_{product_key}"
+        )
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{coordinator.config_entry.entry_id}_sweep")},
+            name="Cheapest nearby",
+            manufacturer="Fuelprices.dk",
+            model=f"Within {coordinator.radius} km",
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return if the product has been seen by the sweep."""
+        return super().available and self._product_key in (self.coordinator.data or {})
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the cheapest price."""
+        if (cheapest := (self.coordinator.data or {}).get(self._product_key)) is None:
+            return None
+        return cheapest.price
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Return the station with the cheapest price."""
+        if (cheapest := (self.coordinator.data or {}).get(self._product_key)) is None:
+            return None
+        return {
+            "company": cheapest.company,
+            "station_id": cheapest.station_id,
+            "station": cheapest.station_name,
+            "distance": cheapest.distance,
+            "updated_at": cheapest.updated_at,
+        }
+
+
+class ApiMetricSensor(SensorEntity):
+    """Diagnostic sensor showing a metric of the API calls."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    entity_description: MetricSensorEntityDescription
+
+    def __init__(
+        self, hub: BraendstofpriserHub, description: MetricSensorEntityDescription
+    ) -> None:
+        """Initialize the sensor."""
+        self._hub = hub
+        self.entity_description = description
+        entry_id = hub.config_entry.entry_id
+        self._attr_unique_id = util_slugify(f"{entry_id}_metrics_{description.key}")
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{entry_id}_api")},
+            name="Fuelprices.dk API",
+            manufacturer="Fuelprices.dk",
+            entry_type=DeviceEntryType.SERVICE,
+            configuration_url=WEBSITE_URL,
+        )
 
-        self.schedule_update_ha_state()
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the current metric."""
+        return self.entity_description.value_fn(self._hub)
@@ -0,0 +1,90 @@
+"""Search index over the station catalog for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_TRANSLATE = str.maketrans({"æ": "ae", "ø": "oe", "å": "aa", "ß": "ss"})
+
+
+def normalize(text: str) -> str:
+    """Normalize text for matching, ignoring case and accents."""
+    text = text.casefold().translate(_TRANSLATE)
+    return "".join(
+        char
+        for char in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(char)
+    )
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into normalized search tokens."""
+    return _TOKEN_RE.findall(normalize(text))
+
+
+class StationIndex:
+    """Prefix and token index over a list of stations, keyed by station ID."""
+
+    def __init__(self, stations: Iterable[dict]) -> None:
+        """Build the index."""
+        self._stations: dict[str, dict] = {}
+        tokens: set[tuple[str, str]] = set()
+        for station in stations:
+            station_id = str(station["id"])
+            self._stations[station_id] = station
+            for token in tokenize(station.get("name") or ""):
+                tokens.add((token, station_id))
+
+        # Sorted (token, id) pairs, so every prefix maps to one contiguous range
+        self._tokens = sorted(tokens)
+        self._keys = [token for token, _ in self._tokens]
+
+    def __len__(self) -> int:
+        """Return the number of indexed stations."""
+        return len(self._stations)
+
+    def get(self, station_id: int | str) -> dict | None:
+        """Return a station by ID."""
+        return self._stations.get(str(station_id))
+
+    def _prefix(self, prefix: str) -> set[str]:
+        """Return the IDs of stations with a token starting with prefix."""
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + "\uffff", start)
+        return {station_id for _, station_id in self._tokens[start:end]}
+
+    def search(self, query: str, limit: int | None = None) -> list[dict]:
+        """Return stations where every query token prefixes a name token."""
+        matches: set[str] | None = None
+        for token in tokenize(query):
+            found = self._prefix(token)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+
+        if matches is None:
+            matches = set(self._stations)
+
+        result = sorted(
+            (self._stations[station_id] for station_id in matches),
+            key=lambda station: normalize(station.get("name") or ""),
+        )
+        return result[:limit] if limit is not None else result
+
+    @staticmethod
+    def options(stations: Iterable[dict]) -> dict[str, str]:
+        """Return ID to label options, with IDs added to duplicate names."""
+        stations = list(stations)
+        names = [station.get("name") or str(station["id"]) for station in stations]
+        counts = Counter(names)
+        return {
+            str(station["id"]): (
+                f"{name} ({station['id']})" if counts[name] > 1 else name
+            )
+            for station, name in zip(stations, names)
+        }
@@ -0,0 +1,138 @@
+"""Hourly long-term statistics import for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify as util_slugify
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .api import APIClient
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+
+
+@dataclass(slots=True)
+class HourlySeries:
+    """Time weighted price of one station product within the current hour."""
+
+    metadata: StatisticMetaData
+    hour: datetime
+    price: float
+    since: datetime
+    weighted: float = 0.0
+    covered: float = 0.0
+    low: float = field(init=False)
+    high: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Start the hour with the price in effect."""
+        self.low = self.high = self.price
+
+    def _advance(self, until: datetime) -> None:
+        """Account for the current price up to a point in time."""
+        seconds = (until - self.since).total_seconds()
+        if seconds > 0:
+            self.weighted += self.price * seconds
+            self.covered += seconds
+            self.since = until
+
+    def update(self, when: datetime, price: float) -> None:
+        """Record a new price within the current hour."""
+        self._advance(when)
+        self.price = price
+        self.low = min(self.low, price)
+        self.high = max(self.high, price)
+
+    def close(self) -> StatisticData:
+        """Finish the current hour and start the next with the same price."""
+        end = self.hour + HOUR
+        self._advance(end)
+        row = StatisticData(
+            start=self.hour,
+            mean=self.weighted / self.covered if self.covered else self.price,
+            min=self.low,
+            max=self.high,
+        )
+        self.hour = end
+        self.weighted = self.covered = 0.0
+        self.low = self.high = self.price
+        return row
+
+
+class PriceStatistics:
+    """Collect hourly price statistics and import them in batches."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the statistics writer."""
+        self._hass = hass
+        self._series: dict[str, HourlySeries] = {}
+        self.imported = 0
+
+    @staticmethod
+    def statistic_id(coordinator: APIClient, product: str) -> str:
+        """Return the external statistic ID of a station product."""
+        return f"{DOMAIN}:{util_slugify(f'{coordinator.subentry_id}_{product}')}"
+
+    @callback
+    def async_record(self, coordinator: APIClient) -> None:
+        """Record the current prices of a station."""
+        now = dt_util.utcnow()
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        for product, price in coordinator.data.items():
+            if price is None:
+                continue
+
+            statistic_id = self.statistic_id(coordinator, product)
+            if (series := self._series.get(statistic_id)) is None:
+                self._series[statistic_id] = HourlySeries(
+                    metadata=StatisticMetaData(
+                        mean_type=StatisticMeanType.ARITHMETIC,
+                        has_sum=False,
+                        name=f"{coordinator.station_name} {product}",
+                        source=DOMAIN,
+                        statistic_id=statistic_id,
+                        unit_class=None,
+                        unit_of_measurement="DKK/L",
+                    ),
+                    hour=hour,
+                    price=price,
+                    since=now,
+                )
+            elif price != series.price:
+                series.update(now, price)
+
+    @callback
+    def async_remove(self, coordinator: APIClient) -> None:
+        """Stop collecting statistics of a station."""
+        for product in coordinator.products:
+            self._series.pop(self.statistic_id(coordinator, product), None)
+
+    @callback
+    def async_flush(self, now: datetime) -> None:
+        """Import every finished hour, one batch per statistic."""
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        for series in self._series.values():
+            rows = []
+            while series.hour < hour:
+                rows.append(series.close())
+            if rows:
+                async_add_external_statistics(self._hass, series.metadata, rows)
+                self.imported += len(rows)
@@ -0,0 +1,174 @@
+"""Persistent station snapshots for dk_fuelprices integration."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DATA_SNAPSHOT_STORES,
+    DOMAIN,
+    HISTORY_SAVE_DELAY,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_VERSION,
+)
+
+
+class SnapshotStore:
+    """Keep the last good data of every station on disk.
+
+    Price histories are much larger than the station data, so they are kept
+    in a file of their own as flat [timestamp, price, ...] lists, and written
+    less often. The requests used of the daily budget are kept as well, so a
+    restart doesn't hand out a fresh allowance.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the snapshot store."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshots"
+        )
+        self._history_store: Store[dict[str, dict[str, list[float]]]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.history"
+        )
+        self._budget_store: Store[dict[str, Any]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.budget"
+        )
+        self._snapshots: dict[str, dict[str, Any]] = {}
+        self._histories: dict[str, dict[str, list[float]]] = {}
+        self._histories_dirty = False
+        self._budget: dict[str, Any] = {}
+        self._budget_dirty = False
+
+    async def async_load(self) -> None:
+        """Load stored snapshots, histories and budget."""
+        self._snapshots = await self._store.async_load() or {}
+        self._histories = await self._history_store.async_load() or {}
+        self._budget = await self._budget_store.async_load() or {}
+
+    def get(self, subentry_id: str) -> dict[str, Any] | None:
+        """Return the stored data of a station, if any."""
+        if (snapshot := self._snapshots.get(subentry_id)) is None:
+            return None
+
+        return {
+            **snapshot,
+            "updated_at": (
+                dt_util.parse_datetime(snapshot["updated_at"])
+                if snapshot.get("updated_at")
+                else None
+            ),
+        }
+
+    def get_history(self, subentry_id: str) -> dict[str, list[float]]:
+        """Return the stored price history of a station as flat lists."""
+        if (history := self._histories.get(subentry_id)) is not None:
+            return history
+
+        # Snapshots written before histories had a file of their own
+        legacy = (self._snapshots.get(subentry_id) or {}).get("history", {})
+        return {
+            product: [value for sample in samples for value in sample]
+            for product, samples in legacy.items()
+        }
+
+    @callback
+    def async_set_history(
+        self, subentry_id: str, history: dict[str, list[float]]
+    ) -> None:
+        """Store the price history of a station, writing to disk after a while."""
+        self._histories[subentry_id] = history
+        self._async_save_histories()
+
+    @callback
+    def _async_save_histories(self) -> None:
+        """Write the histories to disk after a while."""
+        self._histories_dirty = True
+        self._history_store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, list[float]]]:
+        """Return the histories to write to disk."""
+        self._histories_dirty = False
+        return self._histories
+
+    def get_budget(self) -> tuple[date, int] | None:
+        """Return the day and the requests used of the daily budget, if stored."""
+        if not self._budget or (day := dt_util.parse_date(self._budget["day"])) is None:
+            return None
+        return day, self._budget["used"]
+
+    @callback
+    def async_set_budget(self, day: date, used: int) -> None:
+        """Store the requests used of the daily budget, writing to disk after a delay."""
+        budget = {"day": day.isoformat(), "used": used}
+        if self._budget == budget:
+            return
+
+        self._budget = budget
+        self._budget_dirty = True
+        self._budget_store.async_delay_save(self._budget_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _budget_to_save(self) -> dict[str, Any]:
+        """Return the budget state to write to disk."""
+        self._budget_dirty = False
+        return self._budget
+
+    async def async_flush(self) -> None:
+        """Write pending histories and budget now, for when the entry is unloaded."""
+        if self._histories_dirty:
+            await self._history_store.async_save(self._data_to_save())
+        if self._budget_dirty:
+            await self._budget_store.async_save(self._budget_to_save())
+
+    @callback
+    def async_set(self, subentry_id: str, data: dict[str, Any]) -> None:
+        """Store the data of a station, writing to disk after a short delay."""
+        snapshot = {
+            **data,
+            "updated_at": (
+                data["updated_at"].isoformat() if data.get("updated_at") else None
+            ),
+        }
+        if self._snapshots.get(subentry_id) == snapshot:
+            return
+
+        self._snapshots[subentry_id] = snapshot
+        self._store.async_delay_save(lambda: self._snapshots, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def async_delete(self, subentry_id: str) -> None:
+        """Forget the stored data of a station."""
+        if self._snapshots.pop(subentry_id, None) is not None:
+            self._store.async_delay_save(lambda: self._snapshots, SNAPSHOT_SAVE_DELAY)
+        if self._histories.pop(subentry_id, None) is not None:
+            self._async_save_histories()
+
+    async def async_remove(self) -> None:
+        """Remove the snapshot, history and budget files."""
+        self._snapshots = {}
+        self._histories = {}
+        self._histories_dirty = False
+        self._budget = {}
+        self._budget_dirty = False
+        await self._store.async_remove()
+        await self._history_store.async_remove()
+        await self._budget_store.async_remove()
+
+
+async def async_get_snapshot_store(hass: HomeAssistant, entry_id: str) -> SnapshotStore:
+    """Return the snapshot store of a config entry, loading it on first use.
+
+    The store outlives reloads, so removing the entry cancels the writes the
+    hub still had pending.
+    """
+    stores = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_SNAPSHOT_STORES, {})
+    if (store := stores.get(entry_id)) is None:
+        store = stores[entry_id] = SnapshotStore(hass, entry_id)
+        await store.async_load()
+    return store
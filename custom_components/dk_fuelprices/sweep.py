@@ -0,0 +1,238 @@
+"""Regional sweep for the cheapest prices around the home zone."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientError, ClientResponseError
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+
+from .catalog import async_get_catalog
+from .const import DOMAIN, SWEEP_CONCURRENCY, SWEEP_INTERVAL, SWEEP_MAX_STATIONS
+from .geo import SpatialIndex
+
+if TYPE_CHECKING:
+    from .hub import BraendstofpriserHub
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CheapestPrice:
+    """Cheapest known price of a product within the sweep radius."""
+
+    price: float
+    key: str
+    company: str
+    station_id: int
+    station_name: str
+    distance: float
+    updated_at: datetime | None
+
+
+@dataclass(slots=True)
+class SweptStation:
+    """Last swept prices of a station within the sweep radius."""
+
+    distance: float
+    company: str
+    station: dict
+    prices: dict[str, float] | None = None
+    updated_at: datetime | None = None
+
+
+class PriceSweep(DataUpdateCoordinator[dict[str, CheapestPrice]]):
+    """Sweep the stations around the home zone a batch at a time."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        hub: BraendstofpriserHub,
+        radius: float,
+        batch: int,
+    ) -> None:
+        """Initialize the sweep."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=hub.config_entry,
+            name=f"{DOMAIN} sweep",
+            update_interval=SWEEP_INTERVAL,
+            always_update=False,
+        )
+        self.hub = hub
+        self.radius = radius
+        self.batch = batch
+        self._index: SpatialIndex | None = None
+        self._stations: dict[str, SweptStation] = {}
+        self._order: list[str] = []
+        self._cursor = 0
+        self._best: dict[str, CheapestPrice] = {}
+        self.skipped_batches = 0
+
+    async def _async_update_stations(self) -> None:
+        """Refresh the stations within the radius when the catalog changed."""
+        catalog = await async_get_catalog(self.hass)
+        index = await self.hub.async_run_with_key(
+            lambda key: catalog.async_get_spatial_index(key.client, key.scheduler)
+        )
+        if index is self._index:
+            return
+
+        self._index = index
+        stations: dict[str, SweptStation] = {}
+        for distance, company, station in index.nearest(
+            self.hass.config.latitude,
+            self.hass.config.longitude,
+            SWEEP_MAX_STATIONS,
+            self.radius,
+        ):
+            key = f"{company}_{station['id']}"
+            if (known := self._stations.get(key)) is not None:
+                known.distance = distance
+                stations[key] = known
+            else:
+                stations[key] = SweptStation(distance, company, station)
+
+        self._stations = stations
+        self._order = list(stations)
+        self._cursor %= max(len(self._order), 1)
+        self._best = {}
+        for product in {p for s in stations.values() for p in s.prices or {}}:
+            self._async_reduce_product(product)
+        _LOGGER.debug("Sweeping %s station(s) within %s km", len(stations), self.radius)
+
+    def _next_batch(self) -> list[str]:
+        """Return the next batch of station keys, wrapping around the region."""
+        count = min(self.batch, len(self._order))
+        keys = [
+            self._order[(self._cursor + offset) % len(self._order)]
+            for offset in range(count)
+        ]
+        self._cursor = (self._cursor + count) % max(len(self._order), 1)
+        return keys
+
+    async def _async_update_data(self) -> dict[str, CheapestPrice]:
+        """Sweep the next batch of stations and reduce the results."""
+        try:
+            await self._async_update_stations()
+        except ClientResponseError as exc:
+            if exc.status == 401:
+                raise ConfigEntryAuthFailed(exc) from exc
+            raise UpdateFailed(exc) from exc
+        except (ClientError, TimeoutError, ValueError) as exc:
+            raise UpdateFailed(exc) from exc
+
+        if not self.hub.async_sweep_allowed(min(self.batch, len(self._order))):
+            # The stations come first, the sweep only gets what they leave over
+            _LOGGER.debug("Skipping sweep batch to stay within the request budget")
+            self.skipped_batches += 1
+            return dict(self._best)
+
+        keys = self._next_batch()
+        semaphore = asyncio.Semaphore(SWEEP_CONCURRENCY)
+
+        async def _async_fetch(key: str) -> dict:
+            async with semaphore:
+                return await self.hub.async_get_prices(
+                    self._stations[key].station["id"]
+                )
+
+        results = await asyncio.gather(
+            *(_async_fetch(key) for key in keys), return_exceptions=True
+        )
+
+        failed = 0
+        for key, result in zip(keys, results):
+            if isinstance(result, ClientResponseError) and result.status == 401:
+                raise ConfigEntryAuthFailed(result) from result
+            if isinstance(result, (ClientError, TimeoutError, ValueError)):
+                failed += 1
+                _LOGGER.debug("Sweeping station %s failed: %s", key, result)
+                continue
+            if isinstance(result, BaseException):
+                raise result
+
+            self._async_update_station(key, result)
+
+        if keys and failed == len(keys):
+            raise UpdateFailed("Sweep failed for every station in the batch")
+
+        return dict(self._best)
+
+    @callback
+    def _async_update_station(self, key: str, data: dict[str, Any]) -> None:
+        """Fold the new prices of one station into the cheapest prices."""
+        swept = self._stations[key]
+        old = swept.prices or {}
+        prices = {
+            product: price
+            for product, price in data["prices"].items()
+            if isinstance(price, (int, float))
+        }
+        last_update = data["station"].get("last_update")
+        updated_at = datetime.fromisoformat(last_update) if last_update else None
+        if (
+            swept.prices is not None
+            and prices == swept.prices
+            and updated_at == swept.updated_at
+        ):
+            # The prices this sweep saw last time, nothing to reduce
+            return
+
+        swept.prices = prices
+        swept.updated_at = updated_at
+
+        for product in old.keys() | swept.prices.keys():
+            price = swept.prices.get(product)
+            best = self._best.get(product)
+            if price is not None and (best is None or price < best.price):
+                self._best[product] = self._as_cheapest(key, swept, price)
+            elif best is not None and best.key == key:
+                # The cheapest station got more expensive, look through the rest
+                self._async_reduce_product(product)
+
+    @callback
+    def _async_reduce_product(self, product: str) -> None:
+        """Find the cheapest station of a product among all swept stations."""
+        self._best.pop(product, None)
+        for key, swept in self._stations.items():
+            if (price := (swept.prices or {}).get(product)) is None:
+                continue
+            best = self._best.get(product)
+            if best is None or price < best.price:
+                self._best[product] = self._as_cheapest(key, swept, price)
+
+    @staticmethod
+    def _as_cheapest(key: str, swept: SweptStation, price: float) -> CheapestPrice:
+        """Return the cheapest price record for a swept station."""
+        return CheapestPrice(
+            price=price,
+            key=key,
+            company=swept.company,
+            station_id=swept.station["id"],
+            station_name=swept.station.get("name") or str(swept.station["id"]),
+            distance=round(swept.distance, 1),
+            updated_at=swept.updated_at,
+        )
+
+    @callback
+    def async_get_status(self) -> dict[str, Any]:
+        """Return the progress of the sweep."""
+        return {
+            "radius": self.radius,
+            "batch": self.batch,
+            "stations": len(self._stations),
+            "swept": sum(1 for s in self._stations.values() if s.prices is not None),
+            "cursor": self._cursor,
+            "skipped_batches": self.skipped_batches,
+        }
@@ -0,0 +1,426 @@
+"""Benchmark the integration against an in-process fake Fuelprices.dk backend.
+
+Boots a bare Home Assistant instance, sets up a config entry with N station
+subentries through the real setup, coordinator and sensor code, and measures:
+
+- setup wall time of the config entry
+- refresh latency of a full poll of every station
+- event loop blocking while setting up and polling
+- state writes per poll
+- peak memory
+
+Every scale runs in its own process, so memory figures don't leak between
+runs. Results are printed as one JSON object per line. Run from the
+repository root:
+
+    python3 scripts/benchmark.py --stations 1 10 100 1000 --output results.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from pathlib import Path
+from types import MappingProxyType
+from unittest.mock import patch
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+PRODUCTS = ["diesel", "octane_95", "octane_100"]
+
+
+class FakeBackend:
+    """Generated companies, stations and prices with configurable latency."""
+
+    def __init__(self, stations: int, latency: float) -> None:
+        """Initialize the backend."""
+        self.latency = latency
+        self.requests = 0
+        self.updated = datetime(2026, 1, 1, tzinfo=UTC)
+        self.stations = {
+            index: {
+                "id": index,
+                "name": f"Station {index}",
+                "company": f"Company {index % 10}",
+                "latitude": 54.5 + random.random() * 3,
+                "longitude": 8.0 + random.random() * 4.5,
+            }
+            for index in range(1, stations + 1)
+        }
+        self.prices = {
+            index: {product: round(12 + random.random() * 3, 2) for product in PRODUCTS}
+            for index in self.stations
+        }
+        self.last_update = dict.fromkeys(self.stations, self.updated.isoformat())
+
+    async def _async_request(self) -> None:
+        """Simulate a round trip to the API."""
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+
+    def change_prices(self, ratio: float) -> int:
+        """Change the prices of a share of the stations."""
+        self.updated += timedelta(hours=1)
+        changed = random.sample(list(self.stations), round(len(self.stations) * ratio))
+        for station_id in changed:
+            self.prices[station_id] = {
+                product: round(price + random.choice((-0.1, 0.1)), 2)
+                for product, price in self.prices[station_id].items()
+            }
+            self.last_update[station_id] = self.updated.isoformat()
+        return len(changed)
+
+    async def async_get_prices(self, station_id: int) -> dict:
+        """Return the get_prices payload of a station."""
+        await self._async_request()
+        station = self.stations[station_id]
+        return {
+            "station": {
+                "id": station_id,
+                "name": station["name"],
+                "last_update": self.last_update[station_id],
+            },
+            "prices": dict(self.prices[station_id]),
+        }
+
+
+def fake_client(backend: FakeBackend) -> type:
+    """Return a stand-in for pybraendstofpriser.Braendstofpriser."""
+
+    class FakeBraendstofpriser:
+        """In-process Braendstofpriser serving the fake backend."""
+
+        def __init__(self, apikey: str, *args, **kwargs) -> None:
+            """Initialize the client."""
+
+        async def list_companies(self) -> list[dict]:
+            await backend._async_request()
+            names = sorted({s["company"] for s in backend.stations.values()})
+            return [{"company": name} for name in names]
+
+        async def list_stations(self, company_id=None, company_name=None) -> list:
+            await backend._async_request()
+            return [
+                station
+                for station in backend.stations.values()
+                if company_name in (None, station["company"])
+            ]
+
+        async def get_prices(self, station_id: int) -> dict:
+            return await backend.async_get_prices(station_id)
+
+    return FakeBraendstofpriser
+
+
+class LoopMonitor:
+    """Measure how long the event loop is blocked by sampling a short sleep."""
+
+    INTERVAL = 0.001
+
+    def __init__(self) -> None:
+        """Initialize the monitor."""
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _async_run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.INTERVAL)
+            self.lags.append(max(time.perf_counter() - start - self.INTERVAL, 0))
+
+    def start(self) -> None:
+        """Start sampling."""
+        self.lags = []
+        self._task = asyncio.get_running_loop().create_task(self._async_run())
+
+    def stop(self) -> dict:
+        """Stop sampling and return the blocking figures in milliseconds."""
+        self._task.cancel()
+        return {
+            "max_ms": round(max(self.lags, default=0) * 1000, 3),
+            # Lag beyond 10 ms is time other integrations couldn't run
+            "blocked_ms": round(sum(lag for lag in self.lags if lag > 0.01) * 1000, 3),
+        }
+
+
+async def async_start_hass(config_dir: str):
+    """Return a bare Home Assistant instance with registries loaded."""
+    from homeassistant import bootstrap, config_entries, loader
+    from homeassistant.core import CoreState, HomeAssistant
+    from homeassistant.helpers import (
+        area_registry,
+        category_registry,
+        device_registry,
+        entity,
+        entity_registry,
+        floor_registry,
+        issue_registry,
+        label_registry,
+        restore_state,
+        translation,
+    )
+    from homeassistant.setup import async_setup_component
+    from homeassistant.util.unit_system import METRIC_SYSTEM
+
+    hass = HomeAssistant(config_dir)
+    hass.config.latitude = 55.68
+    hass.config.longitude = 12.57
+    hass.config.units = METRIC_SYSTEM
+    hass.config.skip_pip = True
+    await hass.config.async_set_time_zone("Europe/Copenhagen")
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    entity.async_setup(hass)
+    loader.async_setup(hass)
+    translation.async_setup(hass)
+    for registry in (
+        area_registry,
+        category_registry,
+        device_registry,
+        entity_registry,
+        floor_registry,
+        issue_registry,
+        label_registry,
+        restore_state,
+    ):
+        await registry.async_load(hass)
+    hass.data[bootstrap.DATA_REGISTRIES_LOADED] = None
+    hass.set_state(CoreState.running)
+    # The shared client session binds to the configured network adapters
+    await async_setup_component(hass, "network", {})
+    return hass
+
+
+async def async_run_scale(
+    stations: int, latency: float, ratio: float, server: str | None
+) -> dict:
+    """Set up one config entry with the given number of stations and poll it."""
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.const import CONF_API_KEY, EVENT_STATE_CHANGED
+
+    from custom_components.dk_fuelprices import api
+    from custom_components.dk_fuelprices.const import (
+        ATTR_HUB,
+        CONF_COMPANY,
+        CONF_PRODUCTS,
+        CONF_REQUESTS_PER_MINUTE,
+        CONF_STATION,
+        DOMAIN,
+    )
+
+    backend = FakeBackend(stations, latency)
+
+    async def _async_get_prices(cache: api.PriceCache, station_id: int, api_key: str):
+        data = await backend.async_get_prices(station_id)
+        if (cached := cache.get(station_id)) is not None and cached.data == data:
+            # Hand out the known payload, like the real cache does
+            return cached.data
+        cache._entries[station_id] = api.CachedPrices(
+            "", data["station"]["last_update"], data
+        )
+        return data
+
+    if server is None:
+        patches = (
+            patch("pybraendstofpriser.Braendstofpriser", fake_client(backend)),
+            patch.object(api.PriceCache, "async_get_prices", _async_get_prices),
+        )
+    else:
+        # Serve real HTTP requests from scripts/mock_server.py instead
+        async with (
+            aiohttp.ClientSession() as session,
+            session.get(
+                f"{server}/stations", headers={"X-API-KEY": "benchmark"}
+            ) as response,
+        ):
+            response.raise_for_status()
+            served = (await response.json())[:stations]
+        backend.stations = {station["id"]: station for station in served}
+        stations = len(served)
+        patches = (
+            patch("pybraendstofpriser.const.API_ENDPOINT", server),
+            patch(
+                "custom_components.dk_fuelprices.hub.PriceCache",
+                partial(api.PriceCache, base_url=server),
+            ),
+        )
+
+    with (
+        tempfile.TemporaryDirectory() as config_dir,
+        patches[0],
+        patches[1],
+    ):
+        hass = await async_start_hass(config_dir)
+        monitor = LoopMonitor()
+
+        entry = ConfigEntry(
+            data={CONF_API_KEY: "benchmark"},
+            discovery_keys=MappingProxyType({}),
+            domain=DOMAIN,
+            minor_version=1,
+            # Don't let the request scheduler hold back the fake backend
+            options={CONF_REQUESTS_PER_MINUTE: 10**9},
+            source="user",
+            subentries_data=[
+                {
+                    "data": {
+                        CONF_COMPANY: station["company"],
+                        CONF_STATION: {"id": station_id, "name": station["name"]},
+                        CONF_PRODUCTS: dict.fromkeys(PRODUCTS, True),
+                    },
+                    "subentry_type": "station",
+                    "title": f"{station['company']} - {station['name']}",
+                    "unique_id": f"{station['company']}_{station_id}",
+                }
+                for station_id, station in backend.stations.items()
+            ],
+            title="Fuelprices.dk",
+            unique_id=None,
+            version=2,
+        )
+
+        state_writes = 0
+
+        def _count_write(event) -> None:
+            nonlocal state_writes
+            state_writes += 1
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, _count_write)
+
+        tracemalloc.start()
+        monitor.start()
+        start = time.perf_counter()
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        setup_seconds = time.perf_counter() - start
+        setup_loop = monitor.stop()
+        setup_requests = backend.requests if server is None else None
+        setup_writes = state_writes
+
+        hub = hass.data[DOMAIN][entry.entry_id][ATTR_HUB]
+        latencies: list[float] = []
+        refresh = hub._async_refresh
+
+        async def _async_timed_refresh(coordinator) -> None:
+            started = time.perf_counter()
+            await refresh(coordinator)
+            latencies.append(time.perf_counter() - started)
+
+        hub._async_refresh = _async_timed_refresh
+
+        # Against the mock server, its own change pattern applies
+        changed = backend.change_prices(ratio) if server is None else None
+        state_writes = 0
+        monitor.start()
+        start = time.perf_counter()
+        await hub.async_refresh_stations(list(hub.coordinators.values()))
+        await hass.async_block_till_done()
+        poll_seconds = time.perf_counter() - start
+        poll_loop = monitor.stop()
+        poll_writes = state_writes
+
+        _, peak_traced = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop(force=True)
+
+    latencies.sort()
+    return {
+        "stations": stations,
+        "sensors": stations * (len(PRODUCTS) + 1),
+        "latency_ms": latency * 1000 if server is None else None,
+        "setup": {
+            "seconds": round(setup_seconds, 4),
+            "requests": setup_requests,
+            "state_writes": setup_writes,
+            "loop": setup_loop,
+        },
+        "poll": {
+            "seconds": round(poll_seconds, 4),
+            "changed_stations": changed,
+            "state_writes": poll_writes,
+            "refresh_p50_ms": round(statistics.median(latencies) * 1000, 3),
+            "refresh_p95_ms": round(
+                latencies[int(len(latencies) * 0.95) - 1 if stations > 1 else 0] * 1000,
+                3,
+            ),
+            "loop": poll_loop,
+        },
+        "memory": {
+            "peak_traced_mb": round(peak_traced / 2**20, 2),
+            "peak_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2
+            ),
+        },
+    }
+
+
+def main() -> None:
+    """Run every scale in a child process and collect the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument(
+        "--latency", type=float, default=20, help="fake API latency in ms"
+    )
+    parser.add_argument(
+        "--changed", type=float, default=0.2, help="share of stations changing"
+    )
+    parser.add_argument(
+        "--server", help="URL of scripts/mock_server.py to use instead of the fake"
+    )
+    parser.add_argument("--output", type=Path, help="also write JSON lines here")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(
+            async_run_scale(
+                args.stations[0], args.latency / 1000, args.changed, args.server
+            )
+        )
+        print(json.dumps(result))
+        return
+
+    lines = []
+    for stations in args.stations:
+        child = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--child",
+                "--stations",
+                str(stations),
+                "--latency",
+                str(args.latency),
+                "--changed",
+                str(args.changed),
+                *(["--server", args.server] if args.server else []),
+            ],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        line = child.stdout.strip().splitlines()[-1]
+        print(line, flush=True)
+        lines.append(line)
+
+    if args.output:
+        args.output.write_text("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    main()
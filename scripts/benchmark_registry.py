@@ -0,0 +1,176 @@
+"""Benchmark the entity and device registry cleanup done at sensor setup.
+
+Fills the registries of a throwaway Home Assistant instance with thousands of
+station entities, then times the single-pass cleanup against the previous
+per-subentry scan. Run from the repository root:
+
+    python3 scripts/benchmark_registry.py --stations 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.config_entries import ConfigEntry, ConfigSubentry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import slugify as util_slugify
+
+from custom_components.dk_fuelprices.const import DOMAIN
+from custom_components.dk_fuelprices.sensor import async_prune_registry
+
+PRODUCTS = ["diesel", "octane_95", "octane_100", "diesel_plus", "electric"]
+
+
+def legacy_prune(hass: HomeAssistant, entry: ConfigEntry, coordinators) -> None:
+    """Clean up the registries the way sensor setup used to, once per station."""
+    for coordinator in coordinators:
+        expected_unique_ids = {
+            util_slugify(f"{coordinator.subentry_id}_last_updated_last_updated")
+        }
+        for product_key in coordinator.products:
+            expected_unique_ids.add(
+                util_slugify(f"{coordinator.subentry_id}_price_{product_key}")
+            )
+
+        ent_reg = er.async_get(hass)
+        for entity in er.async_entries_for_config_entry(ent_reg, entry.entry_id):
+            if entity.config_subentry_id != coordinator.subentry_id:
+                continue
+            if entity.unique_id and entity.unique_id not in expected_unique_ids:
+                ent_reg.async_remove(entity.entity_id)
+        dev_reg = dr.async_get(hass)
+        for device in dr.async_entries_for_config_entry(dev_reg, entry.entry_id):
+            if (DOMAIN, coordinator.subentry_id) not in device.identifiers:
+                continue
+            if not er.async_entries_for_device(ent_reg, device.id):
+                dev_reg.async_remove_device(device.id)
+
+
+def populate(hass: HomeAssistant, stations: int) -> tuple[ConfigEntry, list]:
+    """Register a config entry with a device and sensors for every station."""
+    subentries = [
+        ConfigSubentry(
+            data=MappingProxyType({}),
+            subentry_type="station",
+            title=f"Station {index}",
+            unique_id=f"Company_{index}",
+        )
+        for index in range(stations)
+    ]
+    entry = ConfigEntry(
+        data={},
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        minor_version=1,
+        options={},
+        source="user",
+        subentries_data=[
+            {
+                "data": {},
+                "subentry_id": subentry.subentry_id,
+                "subentry_type": subentry.subentry_type,
+                "title": subentry.title,
+                "unique_id": subentry.unique_id,
+            }
+            for subentry in subentries
+        ],
+        title="Fuelprices.dk",
+        unique_id=None,
+        version=2,
+    )
+    hass.config_entries._entries[entry.entry_id] = entry
+
+    dev_reg = dr.async_get(hass)
+    ent_reg = er.async_get(hass)
+    coordinators = []
+    for index, subentry_id in enumerate(entry.subentries):
+        device = dev_reg.async_get_or_create(
+            config_entry_id=entry.entry_id,
+            config_subentry_id=subentry_id,
+            identifiers={(DOMAIN, subentry_id)},
+            name=f"Station {index}",
+        )
+        unique_ids = [f"{subentry_id}_last_updated_last_updated"] + [
+            f"{subentry_id}_price_{product}" for product in PRODUCTS
+        ]
+        for unique_id in unique_ids:
+            ent_reg.async_get_or_create(
+                "sensor",
+                DOMAIN,
+                util_slugify(unique_id),
+                config_entry=entry,
+                config_subentry_id=subentry_id,
+                device_id=device.id,
+            )
+        # Every tenth station dropped a product since the last start
+        products = PRODUCTS[:-1] if index % 10 == 0 else PRODUCTS
+        coordinators.append(
+            SimpleNamespace(
+                subentry_id=subentry_id,
+                products={product: {} for product in products},
+            )
+        )
+    return entry, coordinators
+
+
+async def run(name: str, prune, stations: int) -> dict:
+    """Time one cleanup implementation on freshly populated registries."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        # The registries only look up config entries, so a plain dict will do
+        entries: dict[str, ConfigEntry] = {}
+        hass.config_entries = SimpleNamespace(
+            _entries=entries, async_get_entry=entries.get
+        )
+        await dr.async_load(hass)
+        await er.async_load(hass)
+        entry, coordinators = populate(hass, stations)
+        entities = len(
+            er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+        )
+
+        start = time.perf_counter()
+        prune(hass, entry, coordinators)
+        elapsed = time.perf_counter() - start
+
+        remaining = len(
+            er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+        )
+        await hass.async_stop(force=True)
+
+    return {
+        "implementation": name,
+        "stations": stations,
+        "entities": entities,
+        "removed": entities - remaining,
+        "seconds": round(elapsed, 4),
+    }
+
+
+async def main() -> None:
+    """Run the benchmark and print the results as JSON lines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, nargs="+", default=[100, 500, 1000])
+    args = parser.parse_args()
+
+    for stations in args.stations:
+        for name, prune in (
+            ("single_pass", async_prune_registry),
+            ("legacy", legacy_prune),
+        ):
+            print(json.dumps(await run(name, prune, stations)), flush=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,354 @@
+"""Run a local mock of the Fuelprices.dk API for offline load testing.
+
+Serves the companies, stations and prices endpoints used by pybraendstofpriser
+from generated or recorded fixtures, with configurable latency, 401, 429 and
+5xx rates, Retry-After headers and last_update change patterns. Run from the
+repository root:
+
+    python3 scripts/mock_server.py --stations 500 --latency 50 --jitter 30 \
+        --rate-limit 0.05 --retry-after 2 --server-errors 0.01
+
+and point the integration at http://127.0.0.1:8080/api/v1, for example with
+scripts/benchmark.py --server. Every request is counted, and the counters are
+served as JSON at /stats.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from pathlib import Path
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+PRODUCTS = [
+    "bio_diesel",
+    "diesel",
+    "diesel_plus",
+    "octane_92",
+    "octane_95",
+    "octane_100",
+]
+COMPANIES = ["Circle K", "F24", "Go'on", "ingo", "OK", "Q8", "Shell", "Uno-X"]
+
+
+class Fixtures:
+    """Companies, stations and prices served by the mock."""
+
+    def __init__(self, companies: list[dict], stations: list[dict], prices: dict):
+        """Initialize the fixtures."""
+        self.companies = companies
+        self.stations = {station["id"]: station for station in stations}
+        self.prices: dict[int, dict[str, float | None]] = prices
+        now = datetime.now(UTC).replace(microsecond=0)
+        self.last_update = dict.fromkeys(self.stations, now)
+        # Tracked apart from last_update, which may be kept frozen
+        self.changed_at = dict.fromkeys(self.stations, now)
+
+    @classmethod
+    def generate(cls, count: int, seed: int | None) -> Fixtures:
+        """Generate stations spread across Denmark."""
+        rng = random.Random(seed)
+        companies = [
+            {"id": index, "company": name} for index, name in enumerate(COMPANIES, 1)
+        ]
+        stations = []
+        prices = {}
+        for station_id in range(1, count + 1):
+            company = rng.choice(companies)
+            stations.append(
+                {
+                    "id": station_id,
+                    "name": f"{company['company']} Station {station_id}",
+                    "company": company["company"],
+                    "company_id": company["id"],
+                    "latitude": round(rng.uniform(54.6, 57.7), 6),
+                    "longitude": round(rng.uniform(8.1, 12.6), 6),
+                }
+            )
+            prices[station_id] = {
+                product: round(rng.uniform(11.5, 15.5), 2)
+                for product in rng.sample(PRODUCTS, rng.randint(2, len(PRODUCTS)))
+            }
+        return cls(companies, stations, prices)
+
+    @classmethod
+    def load(cls, path: Path) -> Fixtures:
+        """Load recorded companies, stations and prices responses.
+
+        The file holds {"companies": [...], "stations": [...], "prices": [...]},
+        where prices are recorded get_prices responses.
+        """
+        recorded = json.loads(path.read_text())
+        prices = {
+            response["station"]["id"]: dict(response["prices"])
+            for response in recorded["prices"]
+        }
+        stations = [
+            station for station in recorded["stations"] if station["id"] in prices
+        ]
+        return cls(recorded["companies"], stations, prices)
+
+
+class MockServer:
+    """Serve the fixtures, injecting latency, errors and price changes."""
+
+    def __init__(self, fixtures: Fixtures, args: argparse.Namespace) -> None:
+        """Initialize the mock server."""
+        self.fixtures = fixtures
+        self.args = args
+        self.stats: Counter[str] = Counter()
+        self._rng = random.Random(args.seed)
+
+    async def _async_latency(self) -> None:
+        """Sleep for a latency drawn from the configured distribution."""
+        mean = self.args.latency / 1000
+        jitter = self.args.jitter / 1000
+        match self.args.distribution:
+            case "uniform":
+                delay = self._rng.uniform(mean - jitter, mean + jitter)
+            case "normal":
+                delay = self._rng.gauss(mean, jitter)
+            case "lognormal" if mean > 0:
+                # Long tailed, with the given mean and standard deviation
+                sigma2 = (jitter / mean) ** 2
+                delay = self._rng.lognormvariate(
+                    math.log(mean) - 0.5 * math.log1p(sigma2), math.log1p(sigma2) ** 0.5
+                )
+            case _:
+                delay = mean
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _error(self, request: web.Request) -> web.Response | None:
+        """Return an injected error response, if any."""
+        api_key = request.headers.get("X-API-KEY")
+        if not api_key or self.args.api_key and api_key not in self.args.api_key:
+            self.stats["401"] += 1
+            return web.json_response({"detail": "Invalid API key"}, status=401)
+
+        roll = self._rng.random()
+        if roll < self.args.unauthorized:
+            self.stats["401"] += 1
+            return web.json_response({"detail": "Invalid API key"}, status=401)
+        roll -= self.args.unauthorized
+        if roll < self.args.rate_limit:
+            self.stats["429"] += 1
+            headers = {}
+            if self.args.retry_after is not None:
+                retry_at = datetime.now(UTC) + timedelta(seconds=self.args.retry_after)
+                headers["Retry-After"] = (
+                    format_datetime(retry_at, usegmt=True)
+                    if self.args.retry_after_date
+                    else str(self.args.retry_after)
+                )
+            return web.json_response(
+                {"detail": "Too many requests"}, status=429, headers=headers
+            )
+        roll -= self.args.rate_limit
+        if roll < self.args.server_errors:
+            status = self._rng.choice((500, 502, 503, 504))
+            self.stats[str(status)] += 1
+            return web.json_response({"detail": "Server error"}, status=status)
+        return None
+
+    def _change_prices(self, station_id: int) -> None:
+        """Move the prices of a station according to the change pattern."""
+        now = datetime.now(UTC).replace(microsecond=0)
+        if now - self.fixtures.changed_at[station_id] < timedelta(
+            seconds=self.args.change_interval
+        ):
+            return
+        if self._rng.random() >= self.args.change_ratio:
+            return
+        self.fixtures.prices[station_id] = {
+            product: round(price + self._rng.choice((-0.2, -0.1, 0.1, 0.2)), 2)
+            for product, price in self.fixtures.prices[station_id].items()
+        }
+        self.fixtures.changed_at[station_id] = now
+        if not self.args.frozen_last_update:
+            self.fixtures.last_update[station_id] = now
+        self.stats["changes"] += 1
+
+    async def _async_respond(self, request: web.Request, payload) -> web.Response:
+        """Apply latency and error injection, then answer with the payload."""
+        self.stats["requests"] += 1
+        self.stats[f"requests{request.path.removeprefix(self.args.prefix)}"] += 1
+        await self._async_latency()
+        if (error := self._error(request)) is not None:
+            return error
+        if callable(payload):
+            payload = payload()
+        if isinstance(payload, web.Response):
+            return payload
+
+        body = json.dumps(payload).encode()
+        self.stats["200"] += 1
+        self.stats["bytes"] += len(body)
+        return web.Response(body=body, content_type="application/json")
+
+    async def companies(self, request: web.Request) -> web.Response:
+        """Serve the companies endpoint."""
+        return await self._async_respond(request, self.fixtures.companies)
+
+    async def stations(self, request: web.Request) -> web.Response:
+        """Serve the stations endpoint, filtered by company ID or name."""
+        company_id = request.query.get("company_id")
+        company_name = request.query.get("company_name")
+        stations = [
+            station
+            for station in self.fixtures.stations.values()
+            if (company_id is None or str(station.get("company_id")) == company_id)
+            and (company_name is None or station.get("company") == company_name)
+        ]
+        return await self._async_respond(request, stations)
+
+    async def prices(self, request: web.Request) -> web.Response:
+        """Serve the prices endpoint of a single station."""
+        try:
+            station_id = int(request.query["station_id"])
+            station = self.fixtures.stations[station_id]
+        except (KeyError, ValueError):
+            return await self._async_respond(
+                request,
+                web.json_response({"detail": "Station not found"}, status=404),
+            )
+
+        def _payload() -> dict | web.Response:
+            self._change_prices(station_id)
+            last_update = self.fixtures.last_update[station_id]
+            payload = {
+                "company": {"company": station.get("company")},
+                "station": {
+                    "id": station_id,
+                    "name": station["name"],
+                    "last_update": last_update.isoformat(),
+                },
+                "prices": self.fixtures.prices[station_id],
+            }
+            if not self.args.etag:
+                return payload
+
+            etag = '"{}"'.format(
+                hashlib.blake2b(
+                    json.dumps(payload, sort_keys=True).encode(), digest_size=8
+                ).hexdigest()
+            )
+            if request.headers.get("If-None-Match") == etag:
+                self.stats["304"] += 1
+                return web.Response(status=304, headers={"ETag": etag})
+            body = json.dumps(payload).encode()
+            self.stats["200"] += 1
+            self.stats["bytes"] += len(body)
+            return web.Response(
+                body=body, content_type="application/json", headers={"ETag": etag}
+            )
+
+        return await self._async_respond(request, _payload)
+
+    async def statistics(self, request: web.Request) -> web.Response:
+        """Serve the request counters."""
+        return web.json_response(dict(self.stats))
+
+    def application(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application()
+        prefix = self.args.prefix
+        app.router.add_get(f"{prefix}/companies", self.companies)
+        app.router.add_get(f"{prefix}/stations", self.stations)
+        app.router.add_get(f"{prefix}/prices", self.prices)
+        app.router.add_get("/stats", self.statistics)
+        return app
+
+
+def main() -> None:
+    """Parse the arguments and run the mock server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--prefix", default="/api/v1", help="path of the API")
+    parser.add_argument(
+        "--api-key",
+        action="append",
+        help="accepted API key, may be repeated (default: any key is accepted)",
+    )
+    parser.add_argument("--fixtures", type=Path, help="recorded responses to serve")
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument("--seed", type=int, help="seed for repeatable runs")
+
+    latency = parser.add_argument_group("latency")
+    latency.add_argument("--latency", type=float, default=0, help="mean in ms")
+    latency.add_argument("--jitter", type=float, default=0, help="spread in ms")
+    latency.add_argument(
+        "--distribution",
+        choices=["fixed", "uniform", "normal", "lognormal"],
+        default="lognormal",
+    )
+
+    errors = parser.add_argument_group("errors", "Share of requests failing with")
+    errors.add_argument("--unauthorized", type=float, default=0, help="401")
+    errors.add_argument("--rate-limit", type=float, default=0, help="429")
+    errors.add_argument("--server-errors", type=float, default=0, help="5xx")
+    errors.add_argument(
+        "--retry-after", type=int, help="Retry-After seconds sent with 429"
+    )
+    errors.add_argument(
+        "--retry-after-date",
+        action="store_true",
+        help="send Retry-After as an HTTP date instead of seconds",
+    )
+
+    changes = parser.add_argument_group("price changes")
+    changes.add_argument(
+        "--change-ratio",
+        type=float,
+        default=0.1,
+        help="chance a station changes prices when fetched",
+    )
+    changes.add_argument(
+        "--change-interval",
+        type=float,
+        default=3600,
+        help="minimum seconds between price changes of a station",
+    )
+    changes.add_argument(
+        "--frozen-last-update",
+        action="store_true",
+        help="change prices without moving last_update",
+    )
+    changes.add_argument(
+        "--etag", action="store_true", help="send ETags and answer 304 when unchanged"
+    )
+    args = parser.parse_args()
+
+    fixtures = (
+        Fixtures.load(args.fixtures)
+        if args.fixtures
+        else Fixtures.generate(args.stations, args.seed)
+    )
+    server = MockServer(fixtures, args)
+
+    logging.basicConfig(level=logging.INFO)
+    _LOGGER.info(
+        "Serving %s stations of %s companies at http://%s:%s%s",
+        len(fixtures.stations),
+        len(fixtures.companies),
+        args.host,
+        args.port,
+        args.prefix,
+    )
+    web.run_app(server.application(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()